@@ -0,0 +1,257 @@
+"""Benchmark git-wt operations against a synthetic repository.
+
+Usage:
+    python benchmarks/bench.py --files 20000 --refs 5000 --worktrees 20 \\
+        --sync-mb 200 --output results.json
+    python benchmarks/bench.py --compare results.json  # rerun and diff
+    python benchmarks/bench.py --startup-budget 150   # fail on slow startup
+
+The repository is generated in a temporary directory (or --workdir, which is
+reused across runs when the scale matches) and every operation is timed
+--repeat times. Results are written as JSON so runs can be compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from rich.console import Console  # noqa: E402
+
+from git_wt import __version__, git  # noqa: E402
+from git_wt.branches import BranchIndex  # noqa: E402
+from git_wt.config import Config, Hook  # noqa: E402
+from git_wt.hooks import run_hooks  # noqa: E402
+from git_wt.status import iter_statuses  # noqa: E402
+from git_wt.worktree import create_worktree  # noqa: E402
+
+
+def sh(args: list[str], cwd: Path, stdin: str | None = None) -> str:
+    result = subprocess.run(
+        args, cwd=cwd, input=stdin, capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+
+def generate_repo(root: Path, files: int, refs: int, worktrees: int, sync_mb: int):
+    repo = root / "repo"
+    stamp = root / "params.json"
+    params = {"files": files, "refs": refs, "worktrees": worktrees, "sync_mb": sync_mb}
+    if stamp.exists() and json.loads(stamp.read_text()) == params:
+        return repo
+    if root.exists():
+        shutil.rmtree(root)
+    repo.mkdir(parents=True)
+
+    env_args = ["-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+    sh(["git", "init", "-q", "-b", "main"], repo)
+
+    per_dir = 500
+    for i in range(files):
+        d = repo / "src" / f"pkg{i // per_dir:04d}"
+        if i % per_dir == 0:
+            d.mkdir(parents=True)
+        (d / f"file{i}.txt").write_text(f"content {i}\n" * 4)
+    (repo / ".gitignore").write_text("/sync/\n.env\n")
+    sh(["git", "add", "-A"], repo)
+    sh(["git", *env_args, "commit", "-q", "-m", "initial"], repo)
+
+    head = sh(["git", "rev-parse", "HEAD"], repo).strip()
+    updates = "".join(f"create refs/heads/bench/b{i} {head}\n" for i in range(refs))
+    sh(["git", "update-ref", "--stdin"], repo, stdin=updates)
+
+    sync = repo / "sync"
+    sync.mkdir()
+    chunk = os.urandom(1 << 20)
+    for i in range(sync_mb):
+        sub = sync / f"d{i // 50}"
+        sub.mkdir(exist_ok=True)
+        (sub / f"blob{i}.bin").write_bytes(chunk[i:] + chunk[:i])
+    (repo / ".env").write_text("BENCH=1\n")
+
+    for i in range(worktrees):
+        sh(["git", "worktree", "add", "-q", str(root / f"wt{i}"), f"bench/b{i}"], repo)
+
+    stamp.write_text(json.dumps(params))
+    return repo
+
+
+def timed(fn, repeat: int, setup=None, teardown=None) -> dict:
+    runs = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn(state) if setup else fn()
+        runs.append(time.perf_counter() - start)
+        if teardown:
+            teardown(state)
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+        "runs": runs,
+    }
+
+
+def run_benchmarks(repo: Path, repeat: int) -> dict:
+    results = {}
+    counter = iter(range(1_000_000))
+
+    results["startup"] = timed(
+        lambda: subprocess.run(
+            [sys.executable, "-m", "git_wt.cli", "--help"],
+            cwd=repo,
+            env={**os.environ, "PYTHONPATH": str(Path(git.__file__).parent.parent)},
+            capture_output=True,
+            check=True,
+        ),
+        repeat,
+    )
+
+    results["get_worktrees"] = timed(lambda: git.get_worktrees(cwd=repo), repeat)
+
+    def get_branches():
+        git.invalidate_refs()
+        git.get_branches(cwd=repo)
+
+    results["get_branches"] = timed(get_branches, repeat)
+
+    results["branch_index_load"] = timed(lambda: BranchIndex.for_repo(cwd=repo), repeat)
+    index = BranchIndex.for_repo(cwd=repo)
+    results["branch_search"] = timed(
+        lambda: [index.search(query) for query in ("b", "be", "bench/b1", "bb99")],
+        repeat,
+    )
+
+    worktrees = git.get_worktrees(cwd=repo)
+    for quick in (False, True):
+        name = "list_worktrees_quick" if quick else "list_worktrees"
+        results[name] = timed(
+            lambda quick=quick: list(iter_statuses(worktrees, quick=quick)), repeat
+        )
+
+    for mode in ("copy", "symlink", "reflink", "hardlink"):
+        config = Config(file_mode=mode, file_paths=[".env", "sync"])
+
+        def setup():
+            return repo.parent / f"bench-new-{next(counter)}"
+
+        def create(path, config=config):
+            git.invalidate_refs()
+            create_worktree(repo, path.name, path, config)
+
+        def remove(path):
+            git.remove_worktree(path, force=True, cwd=repo)
+            sh(["git", "branch", "-q", "-D", path.name], repo)
+
+        results[f"create_worktree_{mode}"] = timed(create, repeat, setup, remove)
+
+    hooks = [Hook(run="sleep 0.05", name=f"h{i}") for i in range(8)]
+    quiet = Console(quiet=True)
+    for jobs in (1, 4):
+        results[f"run_hooks_jobs{jobs}"] = timed(
+            lambda jobs=jobs: run_hooks(repo, hooks, quiet, jobs=jobs, live=False),
+            repeat,
+        )
+
+    config = Config(file_mode="copy", file_paths=[".env", "sync"])
+
+    def setup_removal():
+        path = repo.parent / f"bench-rm-{next(counter)}"
+        create_worktree(repo, path.name, path, config)
+        return path
+
+    def remove_worktree(path):
+        git.remove_worktree(path, force=True, cwd=repo)
+
+    def delete_branch(path):
+        git.invalidate_refs()
+        sh(["git", "branch", "-q", "-D", path.name], repo)
+
+    results["remove_worktree"] = timed(
+        remove_worktree, repeat, setup_removal, delete_branch
+    )
+    return results
+
+
+def compare(baseline: dict, current: dict) -> None:
+    print(f"{'benchmark':<28} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in current["results"].items():
+        now = result["median"]
+        before = baseline["results"].get(name, {}).get("median")
+        if before is None:
+            print(f"{name:<28} {'-':>10} {now * 1000:>8.1f}ms {'':>8}")
+            continue
+        change = (now - before) / before * 100 if before else 0.0
+        print(
+            f"{name:<28} {before * 1000:>8.1f}ms {now * 1000:>8.1f}ms {change:>+7.1f}%"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--refs", type=int, default=1000)
+    parser.add_argument("--worktrees", type=int, default=10)
+    parser.add_argument("--sync-mb", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workdir", type=Path)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path, metavar="BASELINE")
+    parser.add_argument(
+        "--startup-budget",
+        type=float,
+        metavar="MS",
+        help="Exit non-zero if the median CLI startup time exceeds MS",
+    )
+    args = parser.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="git-wt-bench-"))
+    repo = generate_repo(
+        workdir.resolve(), args.files, args.refs, args.worktrees, args.sync_mb
+    )
+
+    report = {
+        "meta": {
+            "git_wt": __version__,
+            "git": sh(["git", "--version"], repo).strip(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "files": args.files,
+            "refs": args.refs,
+            "worktrees": args.worktrees,
+            "sync_mb": args.sync_mb,
+            "repeat": args.repeat,
+        },
+        "results": run_benchmarks(repo, args.repeat),
+    }
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report)
+    else:
+        for name, result in report["results"].items():
+            print(f"{name:<28} {result['median'] * 1000:>8.1f}ms")
+
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    startup = report["results"]["startup"]["median"] * 1000
+    if args.startup_budget is not None and startup > args.startup_budget:
+        print(f"startup {startup:.1f}ms exceeds budget of {args.startup_budget}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+import sys
+
+from . import git
+from .config import Config
+from .hooks import hook_cache, run_hooks
+from .worktree import create_worktree, generate_worktree_path
+
+
+@dataclass
+class BatchResult:
+    branch: str
+    path: str
+    ok: bool = False
+    new_branch: bool = False
+    from_pool: bool = False
+    synced: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    hooks: list[dict] = field(default_factory=list)
+    error: str | None = None
+
+
+def read_branch_file(path: str) -> list[str]:
+    """Read branch names, one per line; blank lines and ``#`` comments are ignored."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(path).read_text().splitlines()
+    return [
+        line.strip() for line in lines if line.strip() and not line.startswith("#")
+    ]
+
+
+def _create_one(
+    repo_root: Path,
+    branch: str,
+    config: Config,
+    base_branch: str | None,
+    with_hooks: bool,
+    sparse: list[str] | None,
+    no_checkout: bool | None,
+) -> BatchResult:
+    worktree_path = generate_worktree_path(repo_root, branch)
+    result = BatchResult(branch=branch, path=str(worktree_path))
+
+    if worktree_path.exists():
+        result.error = f"Path already exists: {worktree_path}"
+        return result
+
+    try:
+        created = create_worktree(
+            repo_root,
+            branch,
+            worktree_path,
+            config,
+            base_branch=base_branch,
+            sparse=sparse,
+            no_checkout=no_checkout,
+        )
+    except (git.GitError, OSError) as e:
+        result.error = str(e).strip()
+        return result
+
+    result.new_branch = created.is_new_branch
+    result.from_pool = created.from_pool
+    result.synced = created.sync.synced
+    result.skipped = created.sync.skipped
+    result.ok = True
+
+    if with_hooks and config.post_create_hooks:
+        from rich.console import Console
+
+        hook_results = run_hooks(
+            worktree_path,
+            config.post_create_hooks,
+            Console(quiet=True),
+            jobs=config.hook_jobs,
+            cache=hook_cache(repo_root, config),
+            live=False,
+        )
+        result.hooks = [
+            {
+                "name": r.name,
+                "status": r.status,
+                "duration": round(r.duration, 3),
+                "log": str(r.log_path) if r.log_path else None,
+            }
+            for r in hook_results
+        ]
+        result.ok = all(r.ok for r in hook_results)
+
+    return result
+
+
+def create_many(
+    repo_root: Path,
+    branches: list[str],
+    config: Config,
+    base_branch: str | None = None,
+    jobs: int = 4,
+    with_hooks: bool = True,
+    sparse: list[str] | None = None,
+    no_checkout: bool | None = None,
+) -> Iterator[BatchResult]:
+    """Create a worktree per branch concurrently, yielding results as they finish.
+
+    Registering worktrees is serialized inside ``git``; checkout, file sync
+    and hooks for different branches run in parallel.
+    """
+    branches = list(dict.fromkeys(branches))
+    if not branches:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(branches)))) as pool:
+        futures = [
+            pool.submit(
+                _create_one,
+                repo_root,
+                b,
+                config,
+                base_branch,
+                with_hooks,
+                sparse,
+                no_checkout,
+            )
+            for b in branches
+        ]
+        for future in as_completed(futures):
+            yield future.result()
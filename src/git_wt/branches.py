@@ -0,0 +1,148 @@
+from collections.abc import Iterator
+from pathlib import Path
+import bisect
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import re
+import uuid
+
+from . import git
+from .git import Branch
+
+INDEX_NAME = "branches.json"
+SEPARATORS = "/-_."
+# Largest gap between matched characters of each fuzzy tier.
+FUZZY_GAPS = ("{0,2}+", "*+")
+
+
+def refs_token(common_dir: Path) -> str | None:
+    """Stat-based fingerprint of every ref under refs/heads and refs/remotes.
+
+    Creating, moving or deleting a loose ref rewrites its directory (git
+    renames a lock file into place), and packing or pruning rewrites
+    packed-refs, so the directory and packed-refs mtimes cover all changes.
+    """
+    h = hashlib.sha1()
+    try:
+        packed = os.stat(common_dir / "packed-refs")
+        h.update(f"{packed.st_mtime_ns}:{packed.st_size}".encode())
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return None
+    for top in ("heads", "remotes"):
+        for dirpath, _, _ in os.walk(common_dir / "refs" / top):
+            try:
+                h.update(f"{dirpath}:{os.stat(dirpath).st_mtime_ns}".encode())
+            except OSError:
+                return None
+    return h.hexdigest()
+
+
+class BranchIndex:
+    """Branch names ranked by fuzzy match quality and recency."""
+
+    def __init__(self, branches: list[Branch]):
+        self.branches = sorted(branches, key=lambda b: -b.committed)
+        # All names in one newline-delimited string, most recent first, so
+        # each tier of ``search`` is a scan in C that stops after ``limit`` hits.
+        self._text = "\n" + "".join(f"{b.name.lower()}\n" for b in self.branches)
+        self._exact: dict[str, int] = {}
+        for i, b in enumerate(self.branches):
+            self._exact.setdefault(b.name.lower(), i)
+        self._starts = list(
+            itertools.accumulate((len(b.name) + 1 for b in self.branches), initial=1)
+        )
+
+    @classmethod
+    def for_repo(cls, cwd: Path | None = None) -> "BranchIndex":
+        """Load the index persisted under the git common dir, rebuilding it
+        with a single ``for-each-ref`` when any ref has changed since.
+        """
+        common_dir = git.get_common_dir(cwd=cwd)
+        path = common_dir / "git-wt" / INDEX_NAME
+        token = refs_token(common_dir)
+        if token is not None:
+            try:
+                data = json.loads(path.read_text())
+                if data.get("token") == token:
+                    return cls([Branch(*entry) for entry in data["branches"]])
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+
+        index = cls(git.get_branch_details(cwd=cwd))
+        if token is not None:
+            # Stale if refs changed during the query; the next load rebuilds it.
+            if refs_token(common_dir) == token:
+                index.save(path, token)
+        return index
+
+    def save(self, path: Path, token: str) -> None:
+        data = {
+            "token": token,
+            "branches": [
+                [b.name, b.committed, b.author, b.remote] for b in self.branches
+            ],
+        }
+        tmp = path.parent / f".tmp-{uuid.uuid4().hex}"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    @property
+    def names(self) -> list[str]:
+        return [b.name for b in self.branches]
+
+    def search(self, query: str, limit: int = 50) -> list[Branch]:
+        """Branches containing the characters of ``query`` in order.
+
+        Exact and prefix matches come first, then matches starting at a path
+        or word boundary, then other substrings, then scattered matches with
+        small gaps before those with larger ones. Within each tier the most
+        recent commit wins, so every tier is a scan that stops early.
+        """
+        query = query.strip().lower()
+        if not query or "\n" in query:
+            return self.branches[:limit]
+
+        tiers = [
+            [self._exact[query]] if query in self._exact else [],
+            self._find(f"\n{query}"),
+            heapq.merge(*(self._find(sep + query) for sep in SEPARATORS)),
+            self._find(query),
+        ]
+        for gap in FUZZY_GAPS:
+            # A gap never skips the character that follows it, so the
+            # possessive quantifiers cannot give up a match by backtracking.
+            pattern = re.escape(query[0]) + "".join(
+                f"[^\n{re.escape(c)}]{gap}{re.escape(c)}" for c in query[1:]
+            )
+            tiers.append(self._match(pattern))
+
+        found: dict[int, None] = {}
+        for line in itertools.chain.from_iterable(tiers):
+            found.setdefault(line)
+            if len(found) >= limit:
+                break
+        return [self.branches[i] for i in found]
+
+    def _find(self, needle: str) -> Iterator[int]:
+        """Lines containing ``needle``, in order."""
+        at = self._text.find(needle)
+        while at >= 0:
+            yield self._line(at + 1)
+            at = self._text.find(needle, at + 1)
+
+    def _match(self, pattern: str) -> Iterator[int]:
+        """Lines matching the regex ``pattern``, in order."""
+        for match in re.finditer(pattern, self._text):
+            yield self._line(match.start())
+
+    def _line(self, offset: int) -> int:
+        return bisect.bisect_right(self._starts, offset) - 1
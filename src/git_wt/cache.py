@@ -0,0 +1,105 @@
+from pathlib import Path
+import hashlib
+import os
+import shutil
+import uuid
+
+from .config import Hook
+from .copier import CopyPlan, clone_file, copy_plan
+from .store import get_store_root, hash_file
+
+STAMP = ".stamp"
+
+
+def fingerprint(worktree_path: Path, hook: Hook) -> str:
+    """Hash a hook's command together with the contents of its input files."""
+    h = hashlib.sha256(hook.run.encode())
+    files = sorted({p for pattern in hook.inputs for p in worktree_path.glob(pattern)})
+    for path in files:
+        if path.is_file():
+            h.update(b"\0" + path.relative_to(worktree_path).as_posix().encode())
+            h.update(b"\0" + hash_file(path).encode())
+    return h.hexdigest()
+
+
+def _tree_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            total += os.lstat(os.path.join(dirpath, name)).st_size
+    return total
+
+
+def _copy_outputs(source_root: Path, target_root: Path, outputs: list[str]) -> None:
+    plan = CopyPlan()
+    for output in outputs:
+        source = source_root / output
+        target = target_root / output
+        if not source.exists():
+            continue
+        if target.is_dir() and not target.is_symlink():
+            shutil.rmtree(target)
+        elif target.exists() or target.is_symlink():
+            target.unlink()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if source.is_dir():
+            plan.add_tree(source, target)
+        else:
+            plan.add_file(source, target)
+    copy_plan(plan, clone_file)
+
+
+class HookCache:
+    """Per-repo cache of hook outputs, evicted least-recently-used by size."""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def for_repo(cls, max_bytes: int, cwd: Path | None = None) -> "HookCache":
+        return cls(get_store_root(cwd=cwd) / "hook-cache", max_bytes)
+
+    def restore(self, key: str, worktree_path: Path, hook: Hook) -> bool:
+        entry = self.root / key
+        stamp = entry / STAMP
+        if not stamp.exists():
+            return False
+        _copy_outputs(entry, worktree_path, hook.outputs)
+        stamp.touch()
+        return True
+
+    def save(self, key: str, worktree_path: Path, hook: Hook) -> None:
+        entry = self.root / key
+        if (entry / STAMP).exists():
+            return
+        tmp = self.root / f".tmp-{uuid.uuid4().hex}"
+        tmp.mkdir(parents=True)
+        try:
+            _copy_outputs(worktree_path, tmp, hook.outputs)
+            (tmp / STAMP).write_text(str(_tree_size(tmp)))
+            os.rename(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        total = 0
+        for entry in self.root.iterdir():
+            stamp = entry / STAMP
+            if entry.name.startswith(".") or not stamp.exists():
+                continue
+            size = int(stamp.read_text() or 0)
+            entries.append((stamp.stat().st_mtime, size, entry))
+            total += size
+
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
@@ -1,349 +1,593 @@
-import subprocess
+import argparse
+import json
 import sys
+from dataclasses import asdict
 from pathlib import Path
 
-import questionary
-from rich.console import Console
-from rich.table import Table
+from . import git, tracing
+from .config import Config, config_exists, load_config
+from .console import get_console
+
+# Command implementations are imported inside the functions that use them so
+# that each subcommand only pays for the modules it needs at startup.
+
+
+def batch_new(repo_roots: list[Path], args: argparse.Namespace) -> int:
+    """Create the given branches' worktrees in each repo, repos in parallel.
+
+    Prints one JSON result per line; in workspace mode each one names its repo.
+    """
+    import threading
+
+    from . import pool
+    from .batch import create_many, read_branch_file
+    from .workspace import map_repos
+
+    branches = list(args.branches)
+    if args.from_file:
+        branches.extend(read_branch_file(args.from_file))
+    if not branches:
+        print("git-wt: no branches given", file=sys.stderr)
+        return 2
+
+    output = threading.Lock()
+
+    def create(repo_root: Path) -> bool:
+        config = load_config(repo_root)
+        failed = False
+        for result in create_many(
+            repo_root,
+            branches,
+            config,
+            base_branch=args.base,
+            jobs=args.jobs,
+            with_hooks=not args.no_hooks,
+            sparse=args.sparse,
+            no_checkout=args.no_checkout,
+        ):
+            failed = failed or not result.ok
+            record = asdict(result)
+            if len(repo_roots) > 1:
+                record = {"repo": str(repo_root), **record}
+            with output:
+                print(json.dumps(record), flush=True)
+
+        if config.pool_size > 0:
+            pool.refill_in_background(repo_root)
+        return failed
+
+    return 1 if any(map_repos(create, repo_roots, args.repo_jobs)) else 0
+
+
+def expand_worktree(worktree_path: Path, dirs: list[str]) -> int:
+    console = get_console()
+    try:
+        if git.is_sparse(worktree_path):
+            git.add_sparse_checkout(worktree_path, dirs)
+        elif not git.is_checked_out(worktree_path):
+            git.set_sparse_checkout(worktree_path, dirs)
+            git.populate_worktree(worktree_path)
+        else:
+            console.print("[yellow]Worktree is not sparse; nothing to expand[/yellow]")
+            return 0
+    except git.GitError as e:
+        console.print(f"[red]✗ {e}[/red]")
+        return 1
 
-from . import git
-from .config import Config, config_exists, load_config, save_config
-from .hooks import run_hooks
-from .worktree import create_worktree, generate_worktree_path
+    console.print(f"[green]✓ Checked out: {', '.join(dirs)}[/green]")
+    return 0
 
-console = Console()
 
+def show_status(prompt: bool) -> int:
+    from .status import STATUS_STYLES, current_status
 
-def copy_to_clipboard(text: str) -> bool:
-    try:
-        subprocess.run(
-            ["pbcopy"],
-            input=text.encode(),
-            check=True,
-            stderr=subprocess.DEVNULL,
-        )
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
-        pass
+    status = current_status()
+    if status is None:
+        if not prompt:
+            get_console().print("[red]✗ Not a git worktree[/red]")
+        return 1
+    if prompt:
+        print(status)
+    else:
+        get_console().print(STATUS_STYLES[status])
+    return 0
 
-    try:
-        subprocess.run(
-            ["xclip", "-selection", "clipboard"],
-            input=text.encode(),
-            check=True,
-            stderr=subprocess.DEVNULL,
-        )
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
-        pass
 
-    try:
-        subprocess.run(
-            ["xsel", "--clipboard", "--input"],
-            input=text.encode(),
-            check=True,
-            stderr=subprocess.DEVNULL,
-        )
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
-        pass
+def collect_garbage(
+    repo_roots: list[Path], args: argparse.Namespace, workspace: Path | None = None
+) -> int:
+    from rich.table import Table
 
-    return False
+    from . import gc
+    from .store import ObjectStore
+    from .workspace import map_repos, repo_name
 
+    console = get_console()
+    configs = {root: load_config(root) for root in repo_roots}
+    failed = False
 
-def open_in_finder(path: Path) -> bool:
-    try:
-        subprocess.run(["open", str(path)], check=True)
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    def find(repo_root: Path) -> list[gc.Candidate] | str:
         try:
-            subprocess.run(["xdg-open", str(path)], check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+            return gc.find_candidates(
+                repo_root,
+                configs[repo_root],
+                stale_days=args.stale_days,
+                base=args.base,
+            )
+        except git.GitError as e:
+            if workspace is None:
+                raise
+            return str(e)
+
+    found: dict[Path, list[gc.Candidate]] = {}
+    for root, result in zip(repo_roots, map_repos(find, repo_roots, args.repo_jobs)):
+        if isinstance(result, str):
+            failed = True
+            console.print(f"[red]✗ {root}: {result}[/red]")
+        elif result:
+            found[root] = result
+    if not found:
+        console.print("[green]✓ No worktrees to clean up[/green]")
+        return 1 if failed else 0
 
+    table = Table()
+    if workspace is not None:
+        table.add_column("Repo", style="magenta")
+    table.add_column("Branch", style="cyan")
+    table.add_column("Path")
+    table.add_column("Reason")
+    for root, candidates in found.items():
+        for c in candidates:
+            row = [c.worktree.branch or "(detached)", str(c.worktree.path), c.reason]
+            if workspace is not None:
+                row.insert(0, repo_name(root, workspace))
+            table.add_row(*row)
+    console.print(table)
 
-def setup_config(repo_root: Path) -> Config | None:
-    console.print("\n[yellow]No config found. Let's create one.[/yellow]\n")
+    if args.dry_run:
+        return 1 if failed else 0
+    if not args.yes:
+        import questionary
 
-    files_input = questionary.text(
-        "Files to sync (comma-separated):",
-        default=".env, .envrc",
-    ).ask()
+        total = sum(len(c) for c in found.values())
+        prompt = f"Remove {total} worktree(s)?"
+        if workspace is not None:
+            prompt = f"Remove {total} worktree(s) in {len(found)} repositories?"
+        if not questionary.confirm(prompt, default=False).ask():
+            console.print("[dim]Cancelled[/dim]")
+            return 0
 
-    if files_input is None:
-        return None
+    def remove(repo_root: Path) -> list[gc.GcResult]:
+        return gc.remove_candidates(
+            repo_root,
+            found[repo_root],
+            jobs=args.jobs,
+            fast=configs[repo_root].fast_remove,
+        )
 
-    file_paths = [f.strip() for f in files_input.split(",") if f.strip()]
+    roots = list(found)
+    removed_files = freed = 0
+    for repo_root, results in zip(roots, map_repos(remove, roots, args.repo_jobs)):
+        for r in results:
+            if r.ok:
+                console.print(f"[green]✓ Removed: {r.candidate.worktree.path}[/green]")
+            else:
+                failed = True
+                console.print(f"[red]✗ {r.candidate.worktree.path}: {r.error}[/red]")
+
+        if args.delete_branches:
+            protected = gc.protected_branches(
+                repo_root, args.base or gc.default_base(repo_root)
+            )
+            branches = [
+                r.candidate.worktree.branch
+                for r in results
+                if r.ok
+                and r.candidate.reason == "merged"
+                and r.candidate.worktree.branch not in protected
+            ]
+            try:
+                git.delete_branches(branches, cwd=repo_root)
+            except git.GitError as e:
+                failed = True
+                console.print(f"[red]✗ {e}[/red]")
+            else:
+                if branches:
+                    where = ""
+                    if workspace is not None:
+                        where = f" in {repo_name(repo_root, workspace)}"
+                    console.print(
+                        f"[green]✓ Deleted {len(branches)} merged branch(es){where}"
+                        "[/green]"
+                    )
+
+        count, size = ObjectStore.for_repo(cwd=repo_root).prune()
+        removed_files += count
+        freed += size
+    if removed_files:
+        console.print(
+            f"[dim]Freed {freed / 1024**2:.1f} MB from {removed_files} unused "
+            "stored file(s)[/dim]"
+        )
+    return 1 if failed else 0
 
-    mode = questionary.select(
-        "Mode:",
-        choices=["copy", "symlink"],
-        default="copy",
-    ).ask()
 
-    if mode is None:
-        return None
+def list_json(repo_roots: list[Path], jobs: int) -> int:
+    """Stream a JSON record per worktree; in workspace mode each names its repo."""
+    import os
+    import threading
 
-    hook_input = questionary.text(
-        "Post-create hook (optional):",
-        default="",
-    ).ask()
+    from .listing import iter_records
+    from .workspace import map_repos
 
-    if hook_input is None:
-        return None
+    output = threading.Lock()
+    # Set once the reader has gone away, e.g. when piped into head.
+    closed = threading.Event()
 
-    hooks = [hook_input.strip()] if hook_input.strip() else []
+    def describe(repo_root: Path) -> bool:
+        if closed.is_set():
+            return True
+        try:
+            records = iter_records(repo_root, load_config(repo_root))
+            for record in records:
+                data = asdict(record)
+                if len(repo_roots) > 1:
+                    data = {"repo": str(repo_root), **data}
+                with output:
+                    if closed.is_set():
+                        break
+                    try:
+                        print(json.dumps(data), flush=True)
+                    except BrokenPipeError:
+                        closed.set()
+                        break
+        except git.GitError as e:
+            print(f"git-wt: {repo_root}: {e}", file=sys.stderr)
+            return False
+        return True
 
-    save = questionary.confirm("Save config?", default=True).ask()
+    ok = all(map_repos(describe, repo_roots, jobs))
+    if closed.is_set():
+        # Python flushes stdout again at exit; point it at /dev/null so
+        # that flush does not fail on the closed pipe too.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    return 0 if ok else 1
 
-    if save is None:
-        return None
 
-    config = Config(
-        file_mode=mode,
-        file_paths=file_paths,
-        post_create_hooks=hooks,
-    )
+def list_workspace(workspace: Path, repo_roots: list[Path], jobs: int) -> int:
+    from rich.live import Live
+    from rich.table import Table
 
-    if save:
-        save_config(repo_root, config)
-        console.print("[green]✓ Config saved to .git-wt.toml[/green]\n")
+    from . import workspace as ws
+    from .status import STATUS_STYLES
 
-    return config
+    console = get_console()
+    repos = ws.scan(workspace, repo_roots, jobs)
 
+    def render() -> Table:
+        table = Table()
+        table.add_column("Repo", style="magenta")
+        table.add_column("Branch", style="cyan")
+        table.add_column("Path")
+        table.add_column("Status")
+        for repo in repos:
+            if repo.error:
+                table.add_row(repo.name, "", str(repo.root), f"[red]{repo.error}[/red]")
+            for wt, status in zip(repo.worktrees, repo.statuses):
+                cell = STATUS_STYLES[status] if status else "[dim]…[/dim]"
+                table.add_row(repo.name, wt.branch or "(detached)", str(wt.path), cell)
+        return table
 
-def edit_config(repo_root: Path, config: Config) -> Config | None:
     console.print()
-
-    files_input = questionary.text(
-        "Files to sync (comma-separated):",
-        default=", ".join(config.file_paths),
-    ).ask()
-
-    if files_input is None:
-        return None
-
-    file_paths = [f.strip() for f in files_input.split(",") if f.strip()]
-
-    mode = questionary.select(
-        "Mode:",
-        choices=["copy", "symlink"],
-        default=config.file_mode,
-    ).ask()
-
-    if mode is None:
-        return None
-
-    hook_input = questionary.text(
-        "Post-create hook (optional):",
-        default=config.post_create_hooks[0] if config.post_create_hooks else "",
-    ).ask()
-
-    if hook_input is None:
-        return None
-
-    hooks = [hook_input.strip()] if hook_input.strip() else []
-
-    new_config = Config(
-        file_mode=mode,
-        file_paths=file_paths,
-        post_create_hooks=hooks,
-    )
-
-    save_config(repo_root, new_config)
-    console.print("[green]✓ Config saved[/green]\n")
-
-    return new_config
-
-
-def new_worktree(repo_root: Path, config: Config) -> None:
-    branches = git.get_branches(cwd=repo_root)
-
-    branch = questionary.autocomplete(
-        "Branch:",
-        choices=branches,
-        validate=lambda x: len(x.strip()) > 0 or "Branch name required",
-    ).ask()
-
-    if branch is None:
-        return
-
-    branch = branch.strip()
-    
-    # Check if this is a new branch
-    is_new_branch = not git.branch_exists(branch, cwd=repo_root)
-    base_branch = None
-    
-    if is_new_branch:
-        default_base = git.get_default_branch(cwd=repo_root)
-        base_branch = questionary.autocomplete(
-            "Create from branch:",
-            choices=branches,
-            default=default_base,
-            validate=lambda x: len(x.strip()) > 0 or "Base branch required",
-        ).ask()
-        
-        if base_branch is None:
-            return
-        base_branch = base_branch.strip()
-
-    default_path = generate_worktree_path(repo_root, branch)
-
-    path_input = questionary.text(
-        "Path:",
-        default=str(default_path),
-    ).ask()
-
-    if path_input is None:
-        return
-
-    worktree_path = Path(path_input).expanduser().resolve()
-
-    if worktree_path.exists():
-        console.print(f"[red]✗ Path already exists: {worktree_path}[/red]")
-        return
-
+    with Live(render(), console=console, auto_refresh=False) as live:
+        for r, w, status in ws.iter_statuses(repos):
+            repos[r].statuses[w] = status
+            live.update(render(), refresh=True)
     console.print()
+    return 1 if any(repo.error for repo in repos) else 0
 
-    try:
-        synced_files, skipped_files, _ = create_worktree(
-            repo_root, branch, worktree_path, config, base_branch=base_branch
-        )
-        console.print("[green]✓ Worktree created[/green]")
 
-        if synced_files:
-            mode_verb = "Linked" if config.file_mode == "symlink" else "Copied"
-            console.print(f"[green]✓ {mode_verb}: {', '.join(synced_files)}[/green]")
-
-        if skipped_files:
-            console.print(
-                f"[yellow]⚠ Not found: {', '.join(skipped_files)}[/yellow]"
-            )
-
-        if config.post_create_hooks:
-            run_hooks(worktree_path, config.post_create_hooks, console)
-
-        if copy_to_clipboard(str(worktree_path)):
-            console.print("[green]✓ Path copied to clipboard[/green]")
-
-    except git.GitError as e:
-        console.print(f"[red]✗ {e}[/red]")
+def run_workspace(workspace: Path, args: argparse.Namespace) -> int:
+    from .workspace import discover
 
+    console = get_console()
+    if not workspace.is_dir():
+        console.print(f"[red]✗ Not a directory: {workspace}[/red]")
+        return 1
+    repo_roots = discover(workspace)
+    if not repo_roots:
+        console.print(f"[yellow]No git repositories found under {workspace}[/yellow]")
+        return 1
 
-def list_worktrees(repo_root: Path) -> None:
-    worktrees = git.get_worktrees(cwd=repo_root)
+    if args.command == "list" and args.json:
+        return list_json(repo_roots, args.repo_jobs)
+    if args.command in (None, "list"):
+        return list_workspace(workspace, repo_roots, args.repo_jobs)
+    if args.command == "new":
+        return batch_new(repo_roots, args)
+    if args.command == "gc":
+        return collect_garbage(repo_roots, args, workspace)
+    console.print(f"[red]✗ git wt {args.command} does not support --workspace[/red]")
+    return 2
+
+
+def run_daemon(repo_root: Path, args: argparse.Namespace) -> int:
+    from . import daemon
+
+    console = get_console()
+    if args.stop:
+        if daemon.request({"cmd": "stop"}, cwd=repo_root) is None:
+            console.print("[yellow]No daemon is running[/yellow]")
+            return 1
+        console.print("[green]✓ Daemon stopped[/green]")
+        return 0
 
-    if not worktrees:
-        console.print("[yellow]No worktrees found[/yellow]")
-        return
+    if daemon.is_running(cwd=repo_root):
+        console.print(
+            "[yellow]A daemon is already running for this repository[/yellow]"
+        )
+        return 1
+    if args.detach:
+        if not daemon.start_in_background(repo_root):
+            console.print("[red]✗ Daemon did not start[/red]")
+            return 1
+        console.print("[green]✓ Daemon started[/green]")
+        return 0
 
-    table = Table()
-    table.add_column("Branch", style="cyan")
-    table.add_column("Path")
-    table.add_column("Status")
-
-    for wt in worktrees:
-        branch = wt.branch or "(detached)"
-        status = ""
-
-        if wt.is_bare:
-            status = "bare"
-        elif not wt.path.exists():
-            status = "[red]missing[/red]"
-        elif git.is_dirty(wt.path):
-            status = "[yellow]dirty[/yellow]"
-        else:
-            status = "[green]clean[/green]"
+    daemon.serve(repo_root, load_config(repo_root))
+    return 0
 
-        table.add_row(branch, str(wt.path), status)
 
-    console.print()
-    console.print(table)
-    console.print()
+def manage_pool(repo_root: Path, config: Config, action: str) -> int:
+    from . import pool
 
+    console = get_console()
+    if action == "fill":
+        created = pool.fill(repo_root, config)
+        console.print(f"[green]✓ Added {created} spare worktree(s)[/green]")
+    elif action == "drain":
+        removed = pool.drain(repo_root)
+        console.print(f"[green]✓ Removed {removed} spare worktree(s)[/green]")
+    else:
+        ready = len(pool.ready_spares(repo_root))
+        console.print(f"{ready}/{config.pool_size} spare worktrees ready")
+    return 0
 
-def remove_worktree(repo_root: Path) -> None:
-    worktrees = git.get_worktrees(cwd=repo_root)
 
-    main_worktree = repo_root
-    removable = [wt for wt in worktrees if wt.path != main_worktree]
+def print_trace_summary(path: Path) -> None:
+    from rich.console import Console
+    from rich.table import Table
 
-    if not removable:
-        console.print("[yellow]No worktrees to remove[/yellow]")
-        return
+    table = Table(title=f"Trace written to {path}", title_justify="left")
+    table.add_column("Operation")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total", justify="right")
+    table.add_column("Max", justify="right")
+    for name, calls, total, peak in tracing.summarize():
+        table.add_row(name, str(calls), f"{total:.1f}ms", f"{peak:.1f}ms")
+    Console(stderr=True).print(table)
 
-    choices = [
-        questionary.Choice(
-            f"{wt.branch or '(detached)'} ({wt.path})",
-            value=wt,
-        )
-        for wt in removable
-    ]
 
-    selected = questionary.select("Select worktree to remove:", choices=choices).ask()
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="git-wt", description="Manage git worktrees."
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help=(
+            "Record git calls, file syncs and hooks as Chrome trace-event JSON "
+            f"in {tracing.DEFAULT_PATH} (also ${tracing.ENV_VAR}=FILE)"
+        ),
+    )
+    parser.add_argument(
+        "--trace-file",
+        type=Path,
+        metavar="FILE",
+        help="Write the trace to FILE instead (implies --trace)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workspace",
+        type=Path,
+        metavar="ROOT",
+        help=(
+            "Work on every repository under ROOT at once (list, new and gc). "
+            "Outside a repository, $GIT_WT_WORKSPACE is used"
+        ),
+    )
+    parser.add_argument(
+        "--repo-jobs",
+        type=int,
+        default=8,
+        metavar="N",
+        help="Repositories to scan or change at once in workspace mode",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    list_parser = subparsers.add_parser("list", help="List worktrees with their status")
+    list_parser.add_argument(
+        "--json",
+        action="store_true",
+        help=(
+            "Print one JSON object per worktree (NDJSON) as each is ready, with "
+            "its commit, status and ahead/behind counts versus the default branch"
+        ),
+    )
+    sync_parser = subparsers.add_parser(
+        "sync", help="Copy changed synced files to all existing worktrees"
+    )
+    sync_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Also overwrite files that were changed in a worktree",
+    )
+    new_parser = subparsers.add_parser(
+        "new",
+        help="Create worktrees without prompting, printing one JSON result per line",
+    )
+    new_parser.add_argument("branches", nargs="*", metavar="branch")
+    new_parser.add_argument(
+        "--from-file",
+        metavar="FILE",
+        help="Read branch names from FILE, one per line ('-' for stdin)",
+    )
+    new_parser.add_argument("--base", help="Base for new branches (default: default branch)")
+    new_parser.add_argument(
+        "-j", "--jobs", type=int, default=4, help="Worktrees to create at once"
+    )
+    new_parser.add_argument(
+        "--no-hooks", action="store_true", help="Skip post-create hooks"
+    )
+    new_parser.add_argument(
+        "--sparse",
+        action="append",
+        metavar="DIR",
+        help="Only check out DIR (cone mode, repeatable)",
+    )
+    new_parser.add_argument(
+        "--no-checkout",
+        action="store_true",
+        default=None,
+        help="Register the worktree without checking out any files",
+    )
+    expand_parser = subparsers.add_parser(
+        "expand", help="Add directories to a sparse worktree's checkout"
+    )
+    expand_parser.add_argument("dirs", nargs="+", metavar="dir")
+    expand_parser.add_argument(
+        "-C",
+        dest="worktree",
+        type=Path,
+        default=Path.cwd(),
+        help="Worktree to expand (default: current directory)",
+    )
+    status_parser = subparsers.add_parser(
+        "status", help="Show whether the current worktree has uncommitted changes"
+    )
+    status_parser.add_argument(
+        "--prompt",
+        action="store_true",
+        help="Print only the status word, for shell prompts",
+    )
+    gc_parser = subparsers.add_parser(
+        "gc", help="Remove worktrees that are merged, prunable or stale"
+    )
+    gc_parser.add_argument(
+        "--stale-days",
+        type=int,
+        metavar="N",
+        help="Also remove clean worktrees whose last commit is older than N days",
+    )
+    gc_parser.add_argument(
+        "--base", help="Branch to check for merges (default: default branch)"
+    )
+    gc_parser.add_argument(
+        "-n", "--dry-run", action="store_true", help="Only show what would be removed"
+    )
+    gc_parser.add_argument(
+        "-y", "--yes", action="store_true", help="Remove without asking"
+    )
+    gc_parser.add_argument(
+        "--delete-branches",
+        action="store_true",
+        help="Also delete the branches of merged worktrees",
+    )
+    gc_parser.add_argument(
+        "-j", "--jobs", type=int, default=8, help="Worktrees to remove at once"
+    )
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="Keep worktree state in memory and serve it to other git wt commands",
+    )
+    daemon_group = daemon_parser.add_mutually_exclusive_group()
+    daemon_group.add_argument(
+        "--detach", action="store_true", help="Run in the background"
+    )
+    daemon_group.add_argument(
+        "--stop", action="store_true", help="Stop the running daemon"
+    )
+    pool_parser = subparsers.add_parser("pool", help="Manage pre-warmed worktrees")
+    pool_parser.add_argument("action", choices=["fill", "drain", "status"])
+    return parser
 
-    if selected is None:
-        return
 
-    is_dirty = git.is_dirty(selected.path)
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
 
-    if is_dirty:
-        console.print("\n[yellow]⚠ Worktree has uncommitted changes![/yellow]")
-        confirm = questionary.confirm("Remove anyway?", default=False).ask()
-        if not confirm:
-            console.print("[dim]Cancelled[/dim]")
-            return
+    if args.trace_file is not None:
+        trace_path = args.trace_file
+    elif args.trace:
+        trace_path = Path(tracing.DEFAULT_PATH)
+    else:
+        trace_path = tracing.path_from_env()
+    if trace_path is None:
+        return run(args)
 
+    tracing.enable()
     try:
-        git.remove_worktree(selected.path, force=is_dirty, cwd=repo_root)
-        console.print(f"[green]✓ Removed: {selected.path}[/green]")
-    except git.GitError as e:
-        console.print(f"[red]✗ {e}[/red]")
+        return run(args)
+    finally:
+        tracing.write(trace_path)
+        print_trace_summary(trace_path)
+
 
+def run(args: argparse.Namespace) -> int:
+    # Answered before anything else so that cached statuses spawn no git.
+    if args.command == "status":
+        return show_status(args.prompt)
 
-def main_menu(repo_root: Path, config: Config) -> str | None:
-    return questionary.select(
-        "What do you want to do?",
-        choices=[
-            questionary.Choice("New worktree", value="new"),
-            questionary.Choice("List worktrees", value="list"),
-            questionary.Choice("Remove worktree", value="remove"),
-            questionary.Choice("Edit config", value="config"),
-            questionary.Choice("Quit", value="quit"),
-        ],
-    ).ask()
+    if args.workspace is not None:
+        return run_workspace(args.workspace, args)
 
-def main() -> int:
     try:
         main_worktree = git.get_main_worktree()
     except git.GitError:
-        console.print("[red]✗ Not a git repository[/red]")
+        from .workspace import root_from_env
+
+        # Outside any repository, fall back to the configured workspace.
+        workspace = root_from_env()
+        if workspace is not None:
+            return run_workspace(workspace, args)
+        get_console().print("[red]✗ Not a git repository[/red]")
         return 1
 
-    if config_exists(main_worktree):
+    if args.command == "new":
+        return batch_new([main_worktree], args)
+    if args.command == "expand":
+        return expand_worktree(args.worktree, args.dirs)
+    if args.command == "daemon":
+        return run_daemon(main_worktree, args)
+    if args.command == "gc":
+        return collect_garbage([main_worktree], args)
+    if args.command == "list":
+        if args.json:
+            return list_json([main_worktree], args.repo_jobs)
+        from .tui import list_worktrees
+
+        list_worktrees(main_worktree, load_config(main_worktree))
+        return 0
+
+    if args.command is not None:
+        if not config_exists(main_worktree):
+            get_console().print(
+                "[red]✗ No config found. Run git wt to create one.[/red]"
+            )
+            return 1
         config = load_config(main_worktree)
-    else:
-        config = setup_config(main_worktree)
-        if config is None:
-            return 0
+        if args.command == "sync":
+            from .sync import sync_worktrees
 
-    action = main_menu(main_worktree, config)
+            return sync_worktrees(main_worktree, config, force=args.force)
+        if args.command == "pool":
+            return manage_pool(main_worktree, config, args.action)
 
-    if action is None or action == "quit":
-        return 0
-    elif action == "new":
-        new_worktree(main_worktree, config)
-    elif action == "list":
-        list_worktrees(main_worktree)
-    elif action == "remove":
-        remove_worktree(main_worktree)
-    elif action == "config":
-        updated = edit_config(main_worktree, config)
-        if updated:
-            config = updated
+    # The interactive screens pull in questionary and most of rich, so they are
+    # only imported when no subcommand was given.
+    from .tui import run_interactive
 
-    return 0
+    return run_interactive(main_worktree)
 
 
 if __name__ == "__main__":
@@ -5,12 +5,61 @@ import tomllib
 
 CONFIG_FILENAME = ".git-wt.toml"
 
+# Ignored directories that are never synced by ``include_ignored`` or globs:
+# dependencies and build output that each worktree should produce itself.
+DEFAULT_EXCLUDE = [
+    "node_modules",
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".tox",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".next",
+    "dist",
+    "build",
+    "target",
+]
+
+
+@dataclass
+class Hook:
+    run: str
+    name: str = ""
+    after: list[str] = field(default_factory=list)
+    timeout: float | None = None
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+
+    @property
+    def cacheable(self) -> bool:
+        return bool(self.inputs and self.outputs)
+
+    def __post_init__(self) -> None:
+        if not self.name:
+            self.name = self.run
+
 
 @dataclass
 class Config:
     file_mode: str = "copy"
     file_paths: list[str] = field(default_factory=list)
-    post_create_hooks: list[str] = field(default_factory=list)
+    file_workers: int = 8
+    include_ignored: bool = False
+    file_exclude: list[str] = field(default_factory=lambda: list(DEFAULT_EXCLUDE))
+    post_create_hooks: list[Hook] = field(default_factory=list)
+    hook_jobs: int = 1
+    hook_cache_size: int = 5 * 1024**3
+    status_mode: str = "full"
+    status_workers: int = 8
+    status_timeout: float = 10.0
+    status_cache_ttl: float = 5.0
+    daemon_rescan_interval: float = 300.0
+    pool_size: int = 0
+    sparse_paths: list[str] = field(default_factory=list)
+    no_checkout: bool = False
+    fast_remove: bool = True
 
 
 def get_config_path(repo_root: Path) -> Path:
@@ -21,6 +70,49 @@ def config_exists(repo_root: Path) -> bool:
     return get_config_path(repo_root).exists()
 
 
+def parse_hook(entry: str | dict) -> Hook:
+    if isinstance(entry, str):
+        return Hook(run=entry)
+    return Hook(
+        run=entry["run"],
+        name=entry.get("name", ""),
+        after=entry.get("after", []),
+        timeout=entry.get("timeout"),
+        inputs=entry.get("inputs", []),
+        outputs=entry.get("outputs", []),
+    )
+
+
+SIZE_UNITS = {"K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(value: int | str) -> int:
+    if isinstance(value, int):
+        return value
+    value = value.strip().upper().removesuffix("B")
+    if value and value[-1] in SIZE_UNITS:
+        return int(float(value[:-1]) * SIZE_UNITS[value[-1]])
+    return int(value)
+
+
+def format_hook(hook: Hook) -> str:
+    simple = not (hook.after or hook.inputs or hook.outputs)
+    if hook.name == hook.run and simple and hook.timeout is None:
+        return f'"{hook.run}"'
+    fields = [f'name = "{hook.name}"', f'run = "{hook.run}"']
+    if hook.after:
+        after_str = ", ".join(f'"{a}"' for a in hook.after)
+        fields.append(f"after = [{after_str}]")
+    if hook.timeout is not None:
+        fields.append(f"timeout = {hook.timeout}")
+    for key in ("inputs", "outputs"):
+        values = getattr(hook, key)
+        if values:
+            values_str = ", ".join(f'"{v}"' for v in values)
+            fields.append(f"{key} = [{values_str}]")
+    return "{ " + ", ".join(fields) + " }"
+
+
 def load_config(repo_root: Path) -> Config:
     config_path = get_config_path(repo_root)
     if not config_path.exists():
@@ -31,11 +123,31 @@ def load_config(repo_root: Path) -> Config:
 
     files = data.get("files", {})
     hooks = data.get("hooks", {})
+    status = data.get("status", {})
+    pool = data.get("pool", {})
+    daemon = data.get("daemon", {})
+    worktree = data.get("worktree", {})
 
     return Config(
         file_mode=files.get("mode", "copy"),
         file_paths=files.get("paths", []),
-        post_create_hooks=hooks.get("post_create", []),
+        file_workers=files.get("workers", 8),
+        include_ignored=files.get("include_ignored", False),
+        file_exclude=files.get("exclude", list(DEFAULT_EXCLUDE)),
+        post_create_hooks=[parse_hook(h) for h in hooks.get("post_create", [])],
+        hook_jobs=hooks.get("jobs", 1),
+        hook_cache_size=parse_size(hooks.get("cache_size", Config.hook_cache_size)),
+        status_mode=status.get("mode", "full"),
+        status_workers=status.get("workers", 8),
+        status_timeout=status.get("timeout", 10.0),
+        status_cache_ttl=status.get("cache_ttl", 5.0),
+        daemon_rescan_interval=daemon.get(
+            "rescan_interval", Config.daemon_rescan_interval
+        ),
+        pool_size=pool.get("size", 0),
+        sparse_paths=worktree.get("sparse", []),
+        no_checkout=worktree.get("no_checkout", False),
+        fast_remove=worktree.get("fast_remove", True),
     )
 
 
@@ -46,10 +158,58 @@ def save_config(repo_root: Path, config: Config) -> None:
     lines.append(f'mode = "{config.file_mode}"')
     paths_str = ", ".join(f'"{p}"' for p in config.file_paths)
     lines.append(f"paths = [{paths_str}]")
+    if config.file_workers != Config.file_workers:
+        lines.append(f"workers = {config.file_workers}")
+    if config.include_ignored:
+        lines.append("include_ignored = true")
+    if config.file_exclude != DEFAULT_EXCLUDE:
+        exclude_str = ", ".join(f'"{p}"' for p in config.file_exclude)
+        lines.append(f"exclude = [{exclude_str}]")
     lines.append("")
     lines.append("[hooks]")
-    hooks_str = ", ".join(f'"{h}"' for h in config.post_create_hooks)
+    hooks_str = ", ".join(format_hook(h) for h in config.post_create_hooks)
     lines.append(f"post_create = [{hooks_str}]")
+    if config.hook_jobs != Config.hook_jobs:
+        lines.append(f"jobs = {config.hook_jobs}")
+    if config.hook_cache_size != Config.hook_cache_size:
+        lines.append(f"cache_size = {config.hook_cache_size}")
     lines.append("")
 
+    status_lines = []
+    if config.status_mode != Config.status_mode:
+        status_lines.append(f'mode = "{config.status_mode}"')
+    if config.status_workers != Config.status_workers:
+        status_lines.append(f"workers = {config.status_workers}")
+    if config.status_timeout != Config.status_timeout:
+        status_lines.append(f"timeout = {config.status_timeout}")
+    if config.status_cache_ttl != Config.status_cache_ttl:
+        status_lines.append(f"cache_ttl = {config.status_cache_ttl}")
+    if status_lines:
+        lines.append("[status]")
+        lines.extend(status_lines)
+        lines.append("")
+
+    worktree_lines = []
+    if config.sparse_paths:
+        sparse_str = ", ".join(f'"{p}"' for p in config.sparse_paths)
+        worktree_lines.append(f"sparse = [{sparse_str}]")
+    if config.no_checkout:
+        worktree_lines.append("no_checkout = true")
+    if not config.fast_remove:
+        worktree_lines.append("fast_remove = false")
+    if worktree_lines:
+        lines.append("[worktree]")
+        lines.extend(worktree_lines)
+        lines.append("")
+
+    if config.daemon_rescan_interval != Config.daemon_rescan_interval:
+        lines.append("[daemon]")
+        lines.append(f"rescan_interval = {config.daemon_rescan_interval}")
+        lines.append("")
+
+    if config.pool_size != Config.pool_size:
+        lines.append("[pool]")
+        lines.append(f"size = {config.pool_size}")
+        lines.append("")
+
     config_path.write_text("\n".join(lines))
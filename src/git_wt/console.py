@@ -0,0 +1,13 @@
+from functools import cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@cache
+def get_console() -> "Console":
+    """Shared console, created on first use so rich is only imported when needed."""
+    from rich.console import Console
+
+    return Console()
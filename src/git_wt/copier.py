@@ -0,0 +1,203 @@
+import errno
+import os
+import shutil
+import sys
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+FICLONE = 0x40049409
+
+ProgressCallback = Callable[[int, int], None]
+
+# Errors that mean "this kernel/filesystem can't do it", as opposed to a real
+# I/O failure that should propagate.
+_UNSUPPORTED = {
+    errno.ENOSYS,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOTSUP,
+    errno.EOPNOTSUPP,
+    errno.ETXTBSY,
+    errno.EBADF,
+    errno.EPERM,
+}
+
+_CHUNK = 1 << 30
+
+# Small files are handed to the copy pool in batches to amortize scheduling.
+_BATCH_FILES = 64
+_BATCH_BYTES = 64 << 20
+
+
+def _clonefile_darwin(source: Path, target: Path) -> bool:
+    import ctypes
+
+    libc = ctypes.CDLL("libc.dylib", use_errno=True)
+    if not hasattr(libc, "clonefile"):
+        return False
+    if target.exists() or target.is_symlink():
+        target.unlink()
+    return libc.clonefile(os.fsencode(source), os.fsencode(target), 0) == 0
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except OSError:
+        return False
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    offset = 0
+    while offset < size:
+        try:
+            n = os.copy_file_range(src_fd, dst_fd, min(_CHUNK, size - offset))
+        except OSError as e:
+            if offset == 0 and e.errno in _UNSUPPORTED:
+                return False
+            raise
+        if n == 0:
+            break
+        offset += n
+    return offset > 0 or size == 0
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int) -> bool:
+    if not hasattr(os, "sendfile") or not sys.platform.startswith("linux"):
+        return False
+    offset = 0
+    while offset < size:
+        try:
+            n = os.sendfile(dst_fd, src_fd, offset, min(_CHUNK, size - offset))
+        except OSError as e:
+            if offset == 0 and e.errno in _UNSUPPORTED:
+                return False
+            raise
+        if n == 0:
+            break
+        offset += n
+    return offset > 0 or size == 0
+
+
+def clone_file(source: str | Path, target: str | Path) -> str:
+    """Copy a file using the cheapest mechanism available.
+
+    Tries a copy-on-write clone first, then in-kernel copies, then a plain
+    read/write loop. Returns the name of the method that succeeded.
+    """
+    source = Path(source)
+    target = Path(target)
+
+    if sys.platform == "darwin" and _clonefile_darwin(source, target):
+        return "reflink"
+
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        src_fd = src.fileno()
+        dst_fd = dst.fileno()
+        size = os.fstat(src_fd).st_size
+
+        if _reflink(src_fd, dst_fd):
+            method = "reflink"
+        elif _copy_file_range(src_fd, dst_fd, size):
+            method = "copy_file_range"
+        elif _sendfile(src_fd, dst_fd, size):
+            method = "sendfile"
+        else:
+            shutil.copyfileobj(src, dst)
+            method = "copy"
+
+    shutil.copystat(source, target)
+    return method
+
+
+@dataclass
+class CopyPlan:
+    dirs: list[tuple[Path, Path]] = field(default_factory=list)
+    files: list[tuple[Path, Path, int]] = field(default_factory=list)
+    symlinks: list[tuple[str, Path]] = field(default_factory=list)
+    total_bytes: int = 0
+
+    def add_file(self, source: Path, target: Path) -> None:
+        size = os.stat(source).st_size
+        self.files.append((source, target, size))
+        self.total_bytes += size
+
+    def add_tree(self, source: Path, target: Path) -> None:
+        # Directories are recorded parent-first so they can be created in order.
+        stack = [(source, target)]
+        while stack:
+            src, dst = stack.pop()
+            self.dirs.append((src, dst))
+            with os.scandir(src) as it:
+                for entry in it:
+                    entry_target = dst / entry.name
+                    if entry.is_symlink():
+                        self.symlinks.append((os.readlink(entry.path), entry_target))
+                    elif entry.is_dir():
+                        stack.append((Path(entry.path), entry_target))
+                    else:
+                        size = entry.stat().st_size
+                        self.files.append((Path(entry.path), entry_target, size))
+                        self.total_bytes += size
+
+
+def copy_plan(
+    plan: CopyPlan,
+    copy_function: Callable = shutil.copy2,
+    workers: int = 8,
+    on_progress: ProgressCallback | None = None,
+) -> None:
+    """Execute a plan: create directories, then copy files on a thread pool."""
+    for _, dst in plan.dirs:
+        dst.mkdir(exist_ok=True)
+    for link, dst in plan.symlinks:
+        os.symlink(link, dst)
+
+    lock = threading.Lock()
+    done = 0
+
+    def copy_batch(batch: list[tuple[Path, Path, int]]) -> None:
+        nonlocal done
+        for src, dst, size in batch:
+            copy_function(src, dst)
+            if on_progress is not None:
+                with lock:
+                    done += size
+                    on_progress(done, plan.total_bytes)
+
+    batches = []
+    batch = []
+    batch_bytes = 0
+    for item in plan.files:
+        batch.append(item)
+        batch_bytes += item[2]
+        if len(batch) >= _BATCH_FILES or batch_bytes >= _BATCH_BYTES:
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+    if batch:
+        batches.append(batch)
+
+    if len(batches) <= 1 or workers <= 1:
+        for batch in batches:
+            copy_batch(batch)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(copy_batch, b) for b in batches]:
+                future.result()
+
+    for src, dst in reversed(plan.dirs):
+        shutil.copystat(src, dst)
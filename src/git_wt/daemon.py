@@ -0,0 +1,417 @@
+from collections.abc import Iterable
+from dataclasses import asdict, fields
+from pathlib import Path
+import asyncio
+import ctypes
+import hashlib
+import json
+import os
+import select
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from . import git
+from .config import Config
+from .status import worktree_status_async
+
+SOCKET_NAME = "daemon.sock"
+DEBOUNCE = 0.05
+# Longest path a Unix socket can be bound to (sun_path, less the NUL).
+MAX_SOCKET_PATH = 107
+# Tracked directories watched per worktree; the shallowest are kept.
+MAX_TREE_WATCHES = 4096
+
+# From <sys/inotify.h>.
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_IGNORED = 0x8000
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+EVENT = struct.Struct("iIII")
+
+
+def socket_path(common_dir: Path) -> Path:
+    """The daemon's socket in the git common dir, or, when that path is too
+    long to bind, in a per-user directory under the temp dir.
+    """
+    path = common_dir / "git-wt" / SOCKET_NAME
+    if len(os.fsencode(path)) <= MAX_SOCKET_PATH:
+        return path
+    key = hashlib.sha1(os.fsencode(common_dir.resolve())).hexdigest()[:16]
+    return Path(tempfile.gettempdir()) / f"git-wt-{os.getuid()}" / f"{key}.sock"
+
+
+def request(
+    payload: dict, cwd: Path | None = None, timeout: float = 1.0
+) -> dict | None:
+    """Send one request to the repo's daemon. Returns None if none is running."""
+    dirs = git.discover_git_dirs(cwd)
+    if dirs is None:
+        return None
+    path = socket_path(dirs[1])
+    if not path.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        return json.loads(line)
+    except (OSError, ValueError):
+        return None
+
+
+def worktree_to_dict(wt: git.Worktree) -> dict:
+    data = asdict(wt)
+    data["path"] = str(wt.path)
+    return data
+
+
+def worktree_from_dict(data: dict) -> git.Worktree:
+    values = {f.name: data[f.name] for f in fields(git.Worktree) if f.name in data}
+    values["path"] = Path(values["path"])
+    return git.Worktree(**values)
+
+
+class InotifyWatcher:
+    """Report which watched directories changed, using inotify(7) through libc."""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        self._watches: dict[int, Path] = {}
+        # Paths that could not be watched (missing, or out of watches), only
+        # retried when asked to rather than on every change.
+        self._failed: set[Path] = set()
+
+    def watch(self, dirs: Iterable[Path], retry: bool = False) -> None:
+        wanted = set(dirs)
+        if retry:
+            self._failed.clear()
+        for wd, path in list(self._watches.items()):
+            if path not in wanted:
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._watches[wd]
+        self._failed &= wanted
+        for path in wanted - set(self._watches.values()) - self._failed:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = path
+            else:
+                self._failed.add(path)
+
+    def wait(self, timeout: float) -> set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        # Let the rest of a burst (lock file, write, rename) arrive first.
+        time.sleep(DEBOUNCE)
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT.unpack_from(data, offset)
+                start = offset + EVENT.size
+                name = data[start : start + length].rstrip(b"\0")
+                offset = start + length
+                path = self._watches.get(wd)
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                if path is not None and not name.endswith(b".lock"):
+                    changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Fallback for platforms without inotify: compares directory mtimes."""
+
+    interval = 1.0
+
+    def __init__(self):
+        self._mtimes: dict[Path, int | None] = {}
+
+    @staticmethod
+    def _mtime(path: Path) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def watch(self, dirs: Iterable[Path], retry: bool = False) -> None:
+        self._mtimes = {d: self._mtimes.get(d, self._mtime(d)) for d in dirs}
+
+    def wait(self, timeout: float) -> set[Path]:
+        deadline = time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, old in self._mtimes.items():
+                new = self._mtime(path)
+                if new != old:
+                    self._mtimes[path] = new
+                    changed.add(path)
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher() -> InotifyWatcher | PollingWatcher:
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher()
+
+
+class WorktreeState:
+    """The worktree list and each worktree's status, kept current by the daemon."""
+
+    def __init__(
+        self,
+        repo_root: Path,
+        common_dir: Path,
+        config: Config,
+        watch_trees: bool = True,
+    ):
+        self.repo_root = repo_root
+        self.config = config
+        self.list_dir = common_dir / "worktrees"
+        self.watch_trees = watch_trees
+        self.worktrees: list[git.Worktree] = []
+        self.details: dict[Path, dict] = {}
+        # Watched directory -> worktree whose status it affects.
+        self.dirs: dict[Path, Path | None] = {}
+        # Worktree -> (HEAD, tracked directories), refreshed when HEAD moves.
+        self._trees: dict[Path, tuple[str, list[str]]] = {}
+        self._lock = threading.Lock()
+        self._limit = asyncio.Semaphore(max(1, config.status_workers))
+
+    def reload(self) -> set[Path]:
+        """Re-read the worktree list; returns paths of worktrees not seen before."""
+        worktrees = git.get_worktrees(cwd=self.repo_root)
+        if self.watch_trees:
+            self._load_trees(worktrees)
+        dirs: dict[Path, Path | None] = {self.list_dir: None}
+        for wt in worktrees:
+            found = None if wt.is_bare else git.discover_git_dirs(wt.path)
+            if found is None:
+                continue
+            dirs[found[0]] = wt.path
+            dirs[found[0] / "logs"] = wt.path
+            # Edits to files in a watched directory are reported for it, so
+            # the worktree's own directories cover unstaged changes.
+            dirs[wt.path] = wt.path
+            for name in self._trees.get(wt.path, ("", []))[1]:
+                dirs[wt.path / name] = wt.path
+
+        with self._lock:
+            added = {wt.path for wt in worktrees} - set(self.details)
+            self.worktrees = worktrees
+            self.dirs = dirs
+            self.details = {
+                wt.path: self.details[wt.path]
+                for wt in worktrees
+                if wt.path in self.details
+            }
+        return added
+
+    def _load_trees(self, worktrees: list[git.Worktree]) -> None:
+        stale = [
+            wt
+            for wt in worktrees
+            if not wt.is_bare
+            and wt.head
+            and self._trees.get(wt.path, ("",))[0] != wt.head
+        ]
+
+        async def load(wt: git.Worktree) -> list[str]:
+            try:
+                names = await git.get_tree_dirs_async(wt.head, cwd=wt.path)
+            except git.GitError:
+                return []
+            names.sort(key=lambda name: name.count("/"))
+            return names[:MAX_TREE_WATCHES]
+
+        trees = git.run_all(load(wt) for wt in stale)
+        current = {wt.path for wt in worktrees}
+        self._trees = {p: t for p, t in self._trees.items() if p in current}
+        for wt, names in zip(stale, trees):
+            self._trees[wt.path] = (wt.head, names)
+
+    def refresh(self, paths: set[Path] | None = None) -> None:
+        with self._lock:
+            targets = [wt for wt in self.worktrees if paths is None or wt.path in paths]
+        details = git.run_all(self._probe(wt) for wt in targets)
+        with self._lock:
+            for wt, detail in zip(targets, details):
+                self.details[wt.path] = detail
+
+    async def _probe(self, wt: git.Worktree) -> dict:
+        async with self._limit:
+            status = await worktree_status_async(
+                wt,
+                quick=self.config.status_mode == "quick",
+                timeout=self.config.status_timeout,
+            )
+            detail = {"status": status, "ahead": None, "behind": None}
+            if status in ("clean", "dirty") and wt.branch:
+                try:
+                    counts = await git.get_ahead_behind_async(
+                        wt.path, timeout=self.config.status_timeout
+                    )
+                except git.GitTimeoutError:
+                    counts = None
+                if counts is not None:
+                    detail["ahead"], detail["behind"] = counts
+        return detail
+
+    def snapshot(self) -> list[dict]:
+        empty = {"status": None, "ahead": None, "behind": None}
+        with self._lock:
+            return [
+                {**worktree_to_dict(wt), **self.details.get(wt.path, empty)}
+                for wt in self.worktrees
+            ]
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                payload = json.loads(line)
+                reply = self.server.dispatch(payload)
+            except (ValueError, AttributeError, KeyError):
+                reply = {"error": "invalid request"}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, state: WorktreeState):
+        super().__init__(str(path), _Handler)
+        self.state = state
+        self.stopping = threading.Event()
+
+    def dispatch(self, payload: dict) -> dict:
+        command = payload.get("cmd")
+        if command == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if command == "list":
+            return {"worktrees": self.state.snapshot()}
+        if command == "status":
+            path = str(Path(payload["path"]).resolve())
+            for entry in self.state.snapshot():
+                if entry["path"] == path:
+                    return entry
+            return {"error": f"not a known worktree: {path}"}
+        if command == "stop":
+            self.stopping.set()
+            return {"ok": True}
+        return {"error": f"unknown command: {command}"}
+
+
+def is_running(cwd: Path | None = None) -> bool:
+    return request({"cmd": "ping"}, cwd=cwd) is not None
+
+
+def serve(repo_root: Path, config: Config) -> None:
+    """Serve worktree state on the repo's socket until stopped.
+
+    Each worktree's git dir is watched for changes to its index, HEAD and
+    reflog, as is the admin dir where worktrees are added and removed. With
+    inotify, the directories tracked in each worktree are watched too, so
+    only worktrees with changed files are re-probed. Every worktree is also
+    re-probed once per ``daemon.rescan_interval`` seconds, for edits in
+    untracked directories or beyond the watch limits.
+    """
+    common_dir = git.get_common_dir(cwd=repo_root)
+    path = socket_path(common_dir)
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+
+    watcher = make_watcher()
+    # Polling stats every directory each second, so it only covers git dirs.
+    state = WorktreeState(
+        repo_root,
+        common_dir,
+        config,
+        watch_trees=isinstance(watcher, InotifyWatcher),
+    )
+    state.reload()
+    state.refresh()
+
+    server = _Server(path, state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    interval = max(config.daemon_rescan_interval, 1.0)
+    last_full = time.monotonic()
+
+    try:
+        watcher.watch(state.dirs)
+        while not server.stopping.is_set() and common_dir.exists():
+            changed = watcher.wait(timeout=min(interval, 1.0))
+            full = time.monotonic() - last_full >= interval
+            if not changed and not full:
+                continue
+
+            # Reloading the list is a single git call and also picks up new
+            # HEAD commits, so it is done for any change.
+            paths = {state.dirs.get(d) for d in changed} - {None}
+            paths |= state.reload()
+            watcher.watch(state.dirs, retry=full)
+            if full:
+                state.refresh()
+                last_full = time.monotonic()
+            else:
+                state.refresh(paths)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        path.unlink(missing_ok=True)
+        watcher.close()
+
+
+def start_in_background(repo_root: Path, wait: float = 5.0) -> bool:
+    subprocess.Popen(
+        [sys.executable, "-m", "git_wt.cli", "daemon"],
+        cwd=repo_root,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if is_running(cwd=repo_root):
+            return True
+        time.sleep(0.05)
+    return False
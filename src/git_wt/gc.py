@@ -0,0 +1,164 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+import shutil
+import time
+
+from . import git, pool, trash
+from .config import Config
+from .status import iter_statuses
+
+DAY = 24 * 60 * 60
+
+
+@dataclass
+class Candidate:
+    worktree: git.Worktree
+    reason: str
+
+
+@dataclass
+class GcResult:
+    candidate: Candidate
+    ok: bool
+    error: str | None = None
+
+
+def default_base(repo_root: Path) -> str:
+    base = git.get_default_branch(cwd=repo_root)
+    if git.branch_exists(base, cwd=repo_root):
+        return base
+    return f"origin/{base}"
+
+
+def created_at(common_dir: Path, branch: str) -> str | None:
+    """The commit a branch pointed at when it was created, from its reflog."""
+    try:
+        with open(common_dir / "logs" / "refs" / "heads" / branch) as f:
+            fields = f.readline().split()
+    except OSError:
+        return None
+    return fields[1] if len(fields) > 1 else None
+
+
+def protected_branches(repo_root: Path, base: str) -> set[str]:
+    """Branches gc never treats as merged: the base and the default branch.
+
+    ``git branch --merged`` lists the base itself, which may be checked out
+    in a linked worktree.
+    """
+    default = git.get_default_branch(cwd=repo_root)
+    return {base, base.removeprefix("origin/"), default}
+
+
+async def _merged_branches(base: str, repo_root: Path) -> set[str]:
+    try:
+        return await git.get_merged_branches_async(base, cwd=repo_root)
+    except git.GitError:
+        return set()
+
+
+def find_candidates(
+    repo_root: Path,
+    config: Config,
+    stale_days: int | None = None,
+    base: str | None = None,
+) -> list[Candidate]:
+    """Find worktrees that can be removed, with a fixed number of git calls.
+
+    The calls that do not depend on each other run concurrently.
+
+    A worktree qualifies when git reports it prunable, when its branch is
+    merged into ``base`` (default: the default branch) and has commits of its
+    own, other than the base and default branches themselves, or when its HEAD commit is older than ``stale_days``. Merged
+    and stale worktrees must also have no uncommitted or untracked files. The
+    main worktree, locked worktrees and pool spares are never candidates.
+    """
+    worktrees = [
+        wt
+        for wt in git.get_worktrees(cwd=repo_root)[1:]
+        if not wt.is_bare and not wt.is_locked and not pool.is_spare(wt.path, repo_root)
+    ]
+    candidates = [Candidate(wt, "prunable") for wt in worktrees if wt.is_prunable]
+    present = [wt for wt in worktrees if not wt.is_prunable]
+
+    base = base or default_base(repo_root)
+    heads = [wt.head for wt in present] if stale_days is not None else []
+    base_commit, merged, times, common_dir = git.run_all(
+        [
+            git.resolve_commit_async(base, cwd=repo_root),
+            _merged_branches(base, repo_root),
+            git.get_commit_times_async(heads, cwd=repo_root),
+            git.get_common_dir_async(cwd=repo_root),
+        ]
+    )
+
+    merged -= protected_branches(repo_root, base)
+    now = time.time()
+    maybe = []
+    for wt in present:
+        # A branch that never moved from where it was created is reachable
+        # from the base without having been merged into it. Without a reflog
+        # to tell, a branch at the base's tip is assumed to be such a one.
+        if wt.branch in merged:
+            created = created_at(common_dir, wt.branch)
+            start = base_commit if created is None else created
+            if wt.head != start:
+                maybe.append(Candidate(wt, "merged"))
+                continue
+        if stale_days is not None and now - times.get(wt.head, now) > stale_days * DAY:
+            maybe.append(Candidate(wt, "stale"))
+
+    clean = {
+        i
+        for i, status in iter_statuses(
+            [c.worktree for c in maybe],
+            workers=config.status_workers,
+            timeout=config.status_timeout,
+        )
+        if status == "clean"
+    }
+    candidates.extend(c for i, c in enumerate(maybe) if i in clean)
+    return candidates
+
+
+def remove_candidates(
+    repo_root: Path, candidates: list[Candidate], jobs: int = 8, fast: bool = True
+) -> list[GcResult]:
+    """Delete candidate worktrees in parallel.
+
+    With ``fast``, each one, checked to be clean, is moved to the trash
+    without going through git, or deleted directly when the trash is on
+    another filesystem. Otherwise ``git worktree remove`` deletes it, so git
+    checks again that it is clean. The admin entries of all of them are
+    then dropped with a single ``git worktree prune``, and the trash is
+    purged in the background.
+    """
+    if not candidates:
+        return []
+
+    def remove(candidate: Candidate) -> None:
+        path = candidate.worktree.path
+        if not path.exists():
+            return
+        if not fast:
+            git.remove_worktree(path, cwd=repo_root)
+        elif not trash.move_to_trash(path):
+            shutil.rmtree(path)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(candidates)))) as ex:
+        futures = {ex.submit(remove, c): c for c in candidates}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except (OSError, git.GitError) as e:
+                results.append(GcResult(futures[future], False, str(e).strip()))
+            else:
+                results.append(GcResult(futures[future], True))
+
+    git.prune_worktrees(cwd=repo_root)
+    for trash_dir in {trash.trash_dir(c.worktree.path) for c in candidates}:
+        if trash_dir.exists():
+            trash.purge_in_background(trash_dir)
+    return results
@@ -1,13 +1,29 @@
-from dataclasses import dataclass
+from collections.abc import Awaitable, Callable, Coroutine, Iterable, Iterator
+from contextlib import closing
+from dataclasses import dataclass, field
 from pathlib import Path
+import os
 import subprocess
+import threading
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from . import tracing
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+T = TypeVar("T")
 
 
 class GitError(Exception):
     pass
 
 
-@dataclass
+class GitTimeoutError(GitError):
+    pass
+
+
+@dataclass(slots=True)
 class Worktree:
     path: Path
     head: str
@@ -16,16 +32,157 @@ class Worktree:
     is_detached: bool = False
     is_locked: bool = False
     is_prunable: bool = False
+    lock_reason: str | None = None
+    prunable_reason: str | None = None
 
 
-def _run(args: list[str], cwd: Path | None = None) -> subprocess.CompletedProcess:
-    return subprocess.run(
-        ["git"] + args,
-        cwd=cwd,
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+# Commands that write to a repository's shared worktrees admin dir or create
+# refs are serialized per repository, so that worktrees can be created from
+# several threads at once, in one repository or in many.
+_admin_locks: dict[Path | None, threading.Lock] = {}
+_admin_locks_guard = threading.Lock()
+
+
+def admin_lock(cwd: Path | None = None) -> threading.Lock:
+    dirs = discover_git_dirs(cwd)
+    key = dirs[1] if dirs is not None else None
+    with _admin_locks_guard:
+        return _admin_locks.setdefault(key, threading.Lock())
+
+
+# Git runs as asyncio subprocesses on an event loop in a background thread,
+# so independent calls can overlap. asyncio is only imported, and the loop
+# only started, by the first git call.
+MAX_CONCURRENT = max(4, os.cpu_count() or 4)
+_loop = None
+_loop_lock = threading.Lock()
+_limiter = None
+
+
+def _event_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            import asyncio
+            import logging
+
+            # When a timed-out git is killed, asyncio's transport may reap it
+            # before the child watcher does, which only logs a warning.
+            logging.getLogger("asyncio").setLevel(logging.ERROR)
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="git", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def submit(coro: Coroutine[Any, Any, T]) -> "Future[T]":
+    """Schedule a coroutine on the git event loop from any thread."""
+    import asyncio
+
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop())
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine on the git event loop and wait for its result.
+
+    If the wait is interrupted, the coroutine is cancelled, which kills any
+    git process it started.
+    """
+    future = submit(coro)
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def run_all(coros: Iterable[Coroutine[Any, Any, Any]]) -> list:
+    """Run coroutines concurrently on the git event loop; results keep their order."""
+    import asyncio
+
+    async def gather() -> list:
+        return await asyncio.gather(*coros)
+
+    return run_sync(gather())
+
+
+def iter_completed(
+    calls: list[Callable[[], Awaitable[T]]], workers: int = 8
+) -> Iterator[tuple[int, T]]:
+    """Run async calls on the git event loop, at most ``workers`` at a time.
+
+    Yields ``(index, result)`` as each finishes. Calls still running when
+    the iterator is closed are cancelled.
+    """
+    import asyncio
+    from concurrent.futures import as_completed
+
+    if not calls:
+        return
+
+    limit = asyncio.Semaphore(max(1, workers))
+
+    async def limited(call: Callable[[], Awaitable[T]]) -> T:
+        async with limit:
+            return await call()
+
+    futures = {submit(limited(call)): i for i, call in enumerate(calls)}
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+async def run_async(
+    args: list[str], cwd: Path | None = None, timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """Run git, with at most ``MAX_CONCURRENT`` git processes at once."""
+    import asyncio
+
+    global _limiter
+    if _limiter is None:
+        _limiter = asyncio.Semaphore(MAX_CONCURRENT)
+
+    argv = ["git", *args]
+    with tracing.async_span(
+        f"git {args[0]}", "git", argv=argv, cwd=cwd or Path.cwd()
+    ) as info:
+        async with _limiter:
+            proc = await asyncio.create_subprocess_exec(
+                *argv,
+                cwd=cwd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+            except BaseException as e:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                if isinstance(e, TimeoutError):
+                    info["timed_out"] = True
+                    raise GitTimeoutError(
+                        f"git {args[0]} timed out after {timeout}s"
+                    ) from None
+                raise
+        info["exit_code"] = proc.returncode
+        info["output_bytes"] = len(stdout) + len(stderr)
+        return subprocess.CompletedProcess(
+            argv,
+            proc.returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace"),
+        )
+
+
+def _run(
+    args: list[str], cwd: Path | None = None, timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    return run_sync(run_async(args, cwd=cwd, timeout=timeout))
 
 
 def get_repo_root(cwd: Path | None = None) -> Path:
@@ -35,125 +192,343 @@ def get_repo_root(cwd: Path | None = None) -> Path:
     return Path(result.stdout.strip())
 
 
+async def get_common_dir_async(cwd: Path | None = None) -> Path:
+    result = await run_async(
+        ["rev-parse", "--path-format=absolute", "--git-common-dir"], cwd=cwd
+    )
+    if result.returncode != 0:
+        raise GitError("Not a git repository")
+    return Path(result.stdout.strip())
+
+
+def get_common_dir(cwd: Path | None = None) -> Path:
+    return run_sync(get_common_dir_async(cwd=cwd))
+
+
+def discover_git_dirs(cwd: Path | None = None) -> tuple[Path, Path] | None:
+    """Find the git dir and common dir by walking up from ``cwd``, without git.
+
+    Returns None when git's environment overrides are set or the layout is
+    unusual, in which case callers should ask git instead.
+    """
+    if any(v in os.environ for v in ("GIT_DIR", "GIT_COMMON_DIR", "GIT_WORK_TREE")):
+        return None
+
+    start = (cwd or Path.cwd()).resolve()
+    for directory in (start, *start.parents):
+        dotgit = directory / ".git"
+        if dotgit.is_dir():
+            return dotgit, dotgit
+        if dotgit.is_file():
+            content = dotgit.read_text().strip()
+            if not content.startswith("gitdir: "):
+                return None
+            git_dir = (directory / content[len("gitdir: ") :]).resolve()
+            try:
+                common = (git_dir / (git_dir / "commondir").read_text().strip()).resolve()
+            except FileNotFoundError:
+                common = git_dir
+            return git_dir, common
+    return None
+
+
+def get_git_dir(cwd: Path | None = None) -> Path:
+    result = _run(["rev-parse", "--absolute-git-dir"], cwd=cwd)
+    if result.returncode != 0:
+        raise GitError("Not a git repository")
+    return Path(result.stdout.strip())
+
+
+@dataclass
+class RefSnapshot:
+    heads: list[str] = field(default_factory=list)
+    remotes: list[str] = field(default_factory=list)
+    symrefs: dict[str, str] = field(default_factory=dict)
+    head_set: set[str] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.head_set = set(self.heads)
+
+
+_ref_snapshots: dict[Path | None, RefSnapshot] = {}
+
+
+def get_refs(cwd: Path | None = None, refresh: bool = False) -> RefSnapshot:
+    """Load local, remote and symbolic refs with a single for-each-ref call.
+
+    The snapshot is cached for the lifetime of the process; functions that
+    create refs call ``invalidate_refs``.
+    """
+    if not refresh and cwd in _ref_snapshots:
+        return _ref_snapshots[cwd]
+
+    heads = []
+    remotes = []
+    symrefs = {}
+
+    result = _run(
+        ["for-each-ref", "--format=%(refname)%00%(symref)", "refs/heads", "refs/remotes"],
+        cwd=cwd,
+    )
+    if result.returncode == 0:
+        for line in result.stdout.splitlines():
+            refname, _, symref = line.partition("\0")
+            if symref:
+                symrefs[refname] = symref
+            elif refname.startswith("refs/heads/"):
+                heads.append(refname[len("refs/heads/") :])
+            elif refname.startswith("refs/remotes/"):
+                remotes.append(refname[len("refs/remotes/") :])
+
+    snapshot = RefSnapshot(heads=heads, remotes=remotes, symrefs=symrefs)
+    _ref_snapshots[cwd] = snapshot
+    return snapshot
+
+
+def invalidate_refs() -> None:
+    _ref_snapshots.clear()
+
+
 def get_branches(cwd: Path | None = None, include_remote: bool = True) -> list[str]:
+    refs = get_refs(cwd=cwd)
     seen = set()
     branches = []
 
-    local = _run(["branch", "--list", "--format=%(refname:short)"], cwd=cwd)
-    if local.returncode == 0:
-        for b in local.stdout.strip().split("\n"):
-            b = b.strip()
+    for b in refs.heads:
+        if b not in seen:
+            seen.add(b)
+            branches.append(b)
+
+    if include_remote:
+        for b in refs.remotes:
+            if "/HEAD" in b:
+                continue
+            for prefix in ("origin/",):
+                if b.startswith(prefix):
+                    b = b[len(prefix) :]
+                    break
             if b and b not in seen:
                 seen.add(b)
                 branches.append(b)
 
-    if include_remote:
-        remote = _run(["branch", "-r", "--format=%(refname:short)"], cwd=cwd)
-        if remote.returncode == 0:
-            for b in remote.stdout.strip().split("\n"):
-                b = b.strip()
-                if not b or "/HEAD" in b:
-                    continue
-                for prefix in ("origin/",):
-                    if b.startswith(prefix):
-                        b = b[len(prefix) :]
-                        break
-                if b and b not in seen:
-                    seen.add(b)
-                    branches.append(b)
+    return branches
 
+
+@dataclass(slots=True)
+class Branch:
+    name: str
+    committed: int
+    author: str
+    remote: bool = False
+
+
+def get_branch_details(cwd: Path | None = None) -> list[Branch]:
+    """Branches with their committer date and author, from one for-each-ref call.
+
+    Names are deduplicated like ``get_branches``: ``origin/`` is stripped
+    from remote branches and a local branch wins over its remote.
+    """
+    result = _run(
+        [
+            "for-each-ref",
+            "--format=%(refname)%00%(symref)%00%(committerdate:unix)%00%(authorname)",
+            "refs/heads",
+            "refs/remotes",
+        ],
+        cwd=cwd,
+    )
+    if result.returncode != 0:
+        return []
+
+    local = []
+    remote = []
+    for line in result.stdout.splitlines():
+        refname, symref, date, author = (line.split("\0") + ["", "", ""])[:4]
+        if symref:
+            continue
+        committed = int(date) if date.isdigit() else 0
+        if refname.startswith("refs/heads/"):
+            local.append(Branch(refname[len("refs/heads/") :], committed, author))
+        elif refname.startswith("refs/remotes/"):
+            name = refname[len("refs/remotes/") :]
+            if name.startswith("origin/"):
+                name = name[len("origin/") :]
+            if name:
+                remote.append(Branch(name, committed, author, remote=True))
+
+    seen = set()
+    branches = []
+    for branch in local + remote:
+        if branch.name not in seen:
+            seen.add(branch.name)
+            branches.append(branch)
     return branches
 
 
 def get_default_branch(cwd: Path | None = None) -> str:
-    result = _run(["symbolic-ref", "refs/remotes/origin/HEAD"], cwd=cwd)
-    if result.returncode == 0:
-        ref = result.stdout.strip()
+    refs = get_refs(cwd=cwd)
+    ref = refs.symrefs.get("refs/remotes/origin/HEAD")
+    if ref:
         return ref.replace("refs/remotes/origin/", "")
 
     for branch in ["main", "master"]:
-        check = _run(["branch", "--list", branch], cwd=cwd)
-        if check.returncode == 0 and check.stdout.strip():
+        if branch in refs.head_set:
             return branch
 
     return "main"
 
 
-def get_worktrees(cwd: Path | None = None) -> list[Worktree]:
-    result = _run(["worktree", "list", "--porcelain"], cwd=cwd)
-    if result.returncode != 0:
-        raise GitError(f"Failed to list worktrees: {result.stderr}")
-
-    worktrees = []
-    current: dict = {}
-
-    for line in result.stdout.split("\n"):
-        line = line.strip()
-        if not line:
-            if current and "path" in current:
-                worktrees.append(
-                    Worktree(
-                        path=Path(current["path"]),
-                        head=current.get("head", ""),
-                        branch=current.get("branch"),
-                        is_bare=current.get("bare", False),
-                        is_detached=current.get("detached", False),
-                        is_locked=current.get("locked", False),
-                        is_prunable=current.get("prunable", False),
-                    )
-                )
-            current = {}
+def _parse_worktree(record: list[bytes]) -> Worktree | None:
+    wt = None
+    for attr in record:
+        key, _, value = attr.partition(b" ")
+        if key == b"worktree":
+            wt = Worktree(path=Path(os.fsdecode(value)), head="", branch=None)
+        elif wt is None:
             continue
-
-        if line.startswith("worktree "):
-            current["path"] = line[9:]
-        elif line.startswith("HEAD "):
-            current["head"] = line[5:]
-        elif line.startswith("branch "):
-            branch = line[7:]
-            current["branch"] = branch.replace("refs/heads/", "")
-        elif line == "bare":
-            current["bare"] = True
-        elif line == "detached":
-            current["detached"] = True
-        elif line == "locked":
-            current["locked"] = True
-        elif line == "prunable":
-            current["prunable"] = True
-
-    if current and "path" in current:
-        worktrees.append(
-            Worktree(
-                path=Path(current["path"]),
-                head=current.get("head", ""),
-                branch=current.get("branch"),
-                is_bare=current.get("bare", False),
-                is_detached=current.get("detached", False),
-                is_locked=current.get("locked", False),
-                is_prunable=current.get("prunable", False),
-            )
+        elif key == b"HEAD":
+            wt.head = value.decode()
+        elif key == b"branch":
+            wt.branch = os.fsdecode(value).removeprefix("refs/heads/")
+        elif key == b"bare":
+            wt.is_bare = True
+        elif key == b"detached":
+            wt.is_detached = True
+        elif key == b"locked":
+            wt.is_locked = True
+            wt.lock_reason = value.decode(errors="replace") or None
+        elif key == b"prunable":
+            wt.is_prunable = True
+            wt.prunable_reason = value.decode(errors="replace") or None
+    return wt
+
+
+def iter_worktrees(cwd: Path | None = None) -> Iterator[Worktree]:
+    """Yield worktrees as ``git worktree list`` prints them, main worktree first.
+
+    Uses the NUL-delimited porcelain format, so paths and lock reasons may
+    contain newlines. Closing the generator early stops git.
+    """
+    argv = ["git", "worktree", "list", "--porcelain", "-z"]
+    with tracing.span("git worktree", "git", argv=argv, cwd=cwd or Path.cwd()) as info:
+        proc = subprocess.Popen(
+            argv, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
         )
-
-    return worktrees
+        try:
+            pending = b""
+            record: list[bytes] = []
+            while chunk := proc.stdout.read1(64 * 1024):
+                # Attributes end with NUL and records with an extra NUL; the
+                # last piece may be cut off mid-attribute, so it is carried over.
+                *attrs, pending = (pending + chunk).split(b"\0")
+                for attr in attrs:
+                    if attr:
+                        record.append(attr)
+                    elif record:
+                        wt = _parse_worktree(record)
+                        record = []
+                        if wt is not None:
+                            yield wt
+            stderr = proc.stderr.read().decode(errors="replace")
+            info["exit_code"] = proc.wait()
+            if proc.returncode != 0:
+                raise GitError(f"Failed to list worktrees: {stderr}")
+            if record and (wt := _parse_worktree(record)) is not None:
+                yield wt
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            proc.stderr.close()
 
 
-def is_dirty(path: Path) -> bool:
+def get_worktrees(cwd: Path | None = None) -> list[Worktree]:
+    return list(iter_worktrees(cwd=cwd))
+
+
+def iter_ignored_files(cwd: Path | None = None) -> Iterator[str]:
+    """Yield the paths of ignored files, relative to ``cwd``, as git finds them.
+
+    Directories whose contents are all ignored, such as ``node_modules``, are
+    yielded once with a trailing ``/`` and git does not list what is inside.
+    Closing the generator early stops git.
+    """
+    argv = [
+        "git",
+        "ls-files",
+        "--others",
+        "--ignored",
+        "--exclude-standard",
+        "--directory",
+        "--no-empty-directory",
+        "-z",
+    ]
+    with tracing.span("git ls-files", "git", argv=argv, cwd=cwd or Path.cwd()) as info:
+        proc = subprocess.Popen(
+            argv, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        try:
+            pending = b""
+            while chunk := proc.stdout.read1(64 * 1024):
+                *paths, pending = (pending + chunk).split(b"\0")
+                for path in paths:
+                    yield os.fsdecode(path)
+            stderr = proc.stderr.read().decode(errors="replace")
+            info["exit_code"] = proc.wait()
+            if proc.returncode != 0:
+                raise GitError(f"Failed to list ignored files: {stderr}")
+            if pending:
+                yield os.fsdecode(pending)
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            proc.stderr.close()
+
+
+async def is_dirty_async(
+    path: Path, quick: bool = False, timeout: float | None = None
+) -> bool:
+    """Check for uncommitted changes.
+
+    With ``quick``, only tracked files are compared against HEAD and git stops
+    at the first difference, so untracked files are not reported.
+    """
     if not path.exists():
         return False
-    result = _run(["status", "--porcelain"], cwd=path)
+    if quick:
+        result = await run_async(
+            ["diff", "--quiet", "--no-ext-diff", "HEAD", "--"],
+            cwd=path,
+            timeout=timeout,
+        )
+        return result.returncode == 1
+    result = await run_async(["status", "--porcelain"], cwd=path, timeout=timeout)
     if result.returncode != 0:
         return False
     return bool(result.stdout.strip())
 
 
+def is_dirty(path: Path, quick: bool = False, timeout: float | None = None) -> bool:
+    return run_sync(is_dirty_async(path, quick=quick, timeout=timeout))
+
+
 def add_worktree(
     path: Path,
     branch: str,
     new_branch: bool = False,
     base: str | None = None,
     cwd: Path | None = None,
+    detach: bool = False,
+    no_checkout: bool = False,
 ) -> None:
     args = ["worktree", "add"]
+    if detach:
+        args.append("--detach")
+    if no_checkout:
+        args.append("--no-checkout")
 
     if new_branch:
         args.extend(["-b", branch])
@@ -164,7 +539,10 @@ def add_worktree(
         args.append(str(path))
         args.append(branch)
 
-    result = _run(args, cwd=cwd)
+    with admin_lock(cwd):
+        result = _run(args, cwd=cwd)
+    if new_branch:
+        invalidate_refs()
     if result.returncode != 0:
         raise GitError(f"Failed to create worktree: {result.stderr}")
 
@@ -175,21 +553,249 @@ def remove_worktree(path: Path, force: bool = False, cwd: Path | None = None) ->
         args.append("--force")
     args.append(str(path))
 
-    result = _run(args, cwd=cwd)
+    with admin_lock(cwd):
+        result = _run(args, cwd=cwd)
     if result.returncode != 0:
         raise GitError(f"Failed to remove worktree: {result.stderr}")
 
 
+def prune_worktrees(cwd: Path | None = None) -> None:
+    """Drop admin entries of worktrees whose directories no longer exist."""
+    with admin_lock(cwd):
+        result = _run(["worktree", "prune"], cwd=cwd)
+    if result.returncode != 0:
+        raise GitError(f"Failed to prune worktrees: {result.stderr}")
+
+
+def populate_worktree(path: Path) -> None:
+    """Check out HEAD into a worktree that was added with ``no_checkout``."""
+    result = _run(["checkout", "--force", "--quiet"], cwd=path)
+    if result.returncode != 0:
+        raise GitError(f"Failed to check out worktree: {result.stderr}")
+
+
+def set_sparse_checkout(path: Path, patterns: list[str]) -> None:
+    result = _run(["sparse-checkout", "set", "--cone", "--"] + patterns, cwd=path)
+    if result.returncode != 0:
+        raise GitError(f"Failed to set sparse-checkout: {result.stderr}")
+
+
+def add_sparse_checkout(path: Path, patterns: list[str]) -> None:
+    result = _run(["sparse-checkout", "add", "--"] + patterns, cwd=path)
+    if result.returncode != 0:
+        raise GitError(f"Failed to expand sparse-checkout: {result.stderr}")
+
+
+def is_sparse(path: Path) -> bool:
+    result = _run(["config", "--bool", "core.sparseCheckout"], cwd=path)
+    return result.stdout.strip() == "true"
+
+
+def is_checked_out(path: Path) -> bool:
+    """False for worktrees added with ``no_checkout`` that were never populated."""
+    return (get_git_dir(cwd=path) / "index").exists()
+
+
+def move_worktree(path: Path, new_path: Path, cwd: Path | None = None) -> None:
+    with admin_lock(cwd):
+        result = _run(["worktree", "move", str(path), str(new_path)], cwd=cwd)
+    if result.returncode != 0:
+        raise GitError(f"Failed to move worktree: {result.stderr}")
+
+
+def checkout(
+    branch: str,
+    cwd: Path,
+    new_branch: bool = False,
+    base: str | None = None,
+) -> None:
+    args = ["checkout", "--quiet"]
+    if new_branch:
+        args.extend(["-b", branch])
+        if base:
+            args.append(base)
+    else:
+        args.append(branch)
+
+    result = _run(args, cwd=cwd)
+    if new_branch:
+        invalidate_refs()
+    if result.returncode != 0:
+        raise GitError(f"Failed to check out {branch}: {result.stderr}")
+
+
+async def get_ahead_behind_async(
+    path: Path, timeout: float | None = None, base: str = "HEAD@{upstream}"
+) -> tuple[int, int] | None:
+    """Commits the worktree's HEAD is ahead of and behind ``base`` (default:
+    its upstream), or None if there is no such commit.
+    """
+    result = await run_async(
+        ["rev-list", "--left-right", "--count", f"{base}...HEAD"],
+        cwd=path,
+        timeout=timeout,
+    )
+    if result.returncode != 0:
+        return None
+    behind, ahead = result.stdout.split()
+    return int(ahead), int(behind)
+
+
+def get_ahead_behind(
+    path: Path, timeout: float | None = None, base: str = "HEAD@{upstream}"
+) -> tuple[int, int] | None:
+    return run_sync(get_ahead_behind_async(path, timeout=timeout, base=base))
+
+
+async def count_ahead_behind_async(
+    base: str, branches: list[str], cwd: Path | None = None
+) -> dict[str, tuple[int, int]] | None:
+    """Ahead/behind counts of many branches against ``base`` in one call.
+
+    Uses for-each-ref's ``ahead-behind`` atom, which needs git 2.41; returns
+    None on older versions so callers can count per worktree instead.
+    """
+    if not branches:
+        return {}
+    result = await run_async(
+        [
+            "for-each-ref",
+            f"--format=%(refname)%00%(ahead-behind:{base})",
+            *(f"refs/heads/{b}" for b in dict.fromkeys(branches)),
+        ],
+        cwd=cwd,
+    )
+    if result.returncode != 0:
+        return None
+    counts = {}
+    for line in result.stdout.splitlines():
+        refname, _, ahead_behind = line.partition("\0")
+        ahead, behind = ahead_behind.split()
+        counts[refname.removeprefix("refs/heads/")] = (int(ahead), int(behind))
+    return counts
+
+
+async def resolve_commit_async(ref: str, cwd: Path | None = None) -> str | None:
+    result = await run_async(
+        ["rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"], cwd=cwd
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def resolve_commit(ref: str, cwd: Path | None = None) -> str | None:
+    return run_sync(resolve_commit_async(ref, cwd=cwd))
+
+
+async def get_tree_dirs_async(commit: str, cwd: Path | None = None) -> list[str]:
+    """Paths of every directory tracked in ``commit``, relative to the root."""
+    result = await run_async(
+        ["ls-tree", "-r", "-d", "-z", "--name-only", commit], cwd=cwd
+    )
+    if result.returncode != 0:
+        raise GitError(f"Failed to list directories: {result.stderr}")
+    return [name for name in result.stdout.split("\0") if name]
+
+
+async def get_merged_branches_async(base: str, cwd: Path | None = None) -> set[str]:
+    """Local branches whose tips are reachable from ``base``."""
+    result = await run_async(
+        ["branch", "--merged", base, "--format=%(refname)"], cwd=cwd
+    )
+    if result.returncode != 0:
+        raise GitError(f"Failed to list merged branches: {result.stderr}")
+    return {
+        line.removeprefix("refs/heads/") for line in result.stdout.splitlines() if line
+    }
+
+
+def get_merged_branches(base: str, cwd: Path | None = None) -> set[str]:
+    return run_sync(get_merged_branches_async(base, cwd=cwd))
+
+
+async def get_commit_times_async(
+    commits: list[str], cwd: Path | None = None
+) -> dict[str, int]:
+    """Committer timestamps of the given commits, read in one git call."""
+    if not commits:
+        return {}
+    result = await run_async(
+        ["log", "--no-walk=unsorted", "--format=%H %ct", *dict.fromkeys(commits)],
+        cwd=cwd,
+    )
+    if result.returncode != 0:
+        raise GitError(f"Failed to read commits: {result.stderr}")
+    times = {}
+    for line in result.stdout.splitlines():
+        sha, _, timestamp = line.partition(" ")
+        times[sha] = int(timestamp)
+    return times
+
+
+def get_commit_times(commits: list[str], cwd: Path | None = None) -> dict[str, int]:
+    return run_sync(get_commit_times_async(commits, cwd=cwd))
+
+
+@dataclass(slots=True)
+class Commit:
+    sha: str
+    short: str
+    date: str
+    subject: str
+
+
+async def get_commits_async(
+    commits: list[str], cwd: Path | None = None
+) -> dict[str, Commit]:
+    """Abbreviated hash, committer date (ISO 8601) and subject of the given
+    commits, read in one git call.
+    """
+    commits = [c for c in dict.fromkeys(commits) if c]
+    if not commits:
+        return {}
+    result = await run_async(
+        ["log", "--no-walk=unsorted", "--format=%H%x00%h%x00%cI%x00%s", *commits],
+        cwd=cwd,
+    )
+    if result.returncode != 0:
+        raise GitError(f"Failed to read commits: {result.stderr}")
+    found = {}
+    for line in result.stdout.splitlines():
+        commit = Commit(*line.split("\0", 3))
+        found[commit.sha] = commit
+    return found
+
+
+def get_commits(commits: list[str], cwd: Path | None = None) -> dict[str, Commit]:
+    return run_sync(get_commits_async(commits, cwd=cwd))
+
+
+def delete_branches(branches: list[str], cwd: Path | None = None) -> None:
+    if not branches:
+        return
+    with admin_lock(cwd):
+        result = _run(["branch", "--delete", "--force", "--", *branches], cwd=cwd)
+    invalidate_refs()
+    if result.returncode != 0:
+        raise GitError(f"Failed to delete branches: {result.stderr}")
+
+
 def branch_exists(branch: str, cwd: Path | None = None) -> bool:
-    result = _run(["rev-parse", "--verify", f"refs/heads/{branch}"], cwd=cwd)
-    return result.returncode == 0
+    return branch in get_refs(cwd=cwd).head_set
+
 
 def get_main_worktree(cwd: Path | None = None) -> Path:
     """Get the main (first) worktree path. Works from any worktree."""
-    worktrees = get_worktrees(cwd=cwd)
-    if not worktrees:
+    dirs = discover_git_dirs(cwd)
+    if dirs is not None and dirs[1].name == ".git":
+        return dirs[1].parent
+
+    with closing(iter_worktrees(cwd=cwd)) as worktrees:
+        main = next(worktrees, None)
+    if main is None:
         raise GitError("No worktrees found")
-    return worktrees[0].path
+    return main.path
 
 
 def is_main_worktree(path: Path, cwd: Path | None = None) -> bool:
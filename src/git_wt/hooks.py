@@ -1,41 +1,276 @@
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
+import os
+import re
 import shlex
+import signal
 import subprocess
+import threading
+import time
+from typing import TYPE_CHECKING
 
-from rich.console import Console
+from . import git, tracing
+from .cache import HookCache, fingerprint
+from .config import Config, Hook
 
+if TYPE_CHECKING:
+    from rich.console import Console, Group
 
-def run_hooks(
-    worktree_path: Path, hooks: list[str], console: Console
-) -> list[tuple[str, bool]]:
-    results = []
-
-    for hook in hooks:
-        hook_path = worktree_path / hook
-
-        if hook_path.exists():
-            cmd = [str(hook_path)]
-        else:
-            cmd = shlex.split(hook)
-
-        console.print(f"  [dim]Running: {hook}[/dim]")
-
-        result = subprocess.run(
-            cmd,
-            cwd=worktree_path,
-            capture_output=True,
-            text=True,
-            shell=False,
+TAIL_LINES = 3
+FAILURE_LINES = 20
+MAX_LINE = 64 * 1024
+
+
+@dataclass
+class HookResult:
+    name: str
+    ok: bool
+    status: str
+    duration: float = 0.0
+    returncode: int | None = None
+    log_path: Path | None = None
+
+
+def hook_cache(repo_root: Path, config: Config) -> HookCache | None:
+    if not any(h.cacheable for h in config.post_create_hooks):
+        return None
+    return HookCache.for_repo(config.hook_cache_size, cwd=repo_root)
+
+
+class HookTail:
+    """Live view of the last few output lines of each running hook."""
+
+    def __init__(self, lines: int = TAIL_LINES):
+        self.lines = lines
+        self._tails: dict[str, deque[str]] = {}
+        self._lock = threading.Lock()
+
+    def start(self, name: str) -> None:
+        with self._lock:
+            self._tails[name] = deque(maxlen=self.lines)
+
+    def push(self, name: str, line: str) -> None:
+        with self._lock:
+            self._tails[name].append(line)
+
+    def stop(self, name: str) -> None:
+        with self._lock:
+            self._tails.pop(name, None)
+
+    def __rich__(self) -> "Group":
+        from rich.console import Group
+        from rich.text import Text
+
+        with self._lock:
+            rows = []
+            for name, tail in self._tails.items():
+                rows.append(Text(f"  ▸ {name}", style="cyan"))
+                rows.extend(Text(f"    {line}", style="dim") for line in tail)
+        return Group(*rows)
+
+
+def log_path(log_dir: Path, hook: Hook) -> Path:
+    name = re.sub(r"[^a-zA-Z0-9_.-]+", "-", hook.name).strip("-") or "hook"
+    return log_dir / f"{name}.log"
+
+
+def _run_hook(
+    worktree_path: Path,
+    hook: Hook,
+    console: "Console",
+    cache: HookCache | None,
+    log_dir: Path,
+    tail: HookTail | None,
+) -> HookResult:
+    key = None
+    if cache is not None and hook.cacheable:
+        start = time.perf_counter()
+        key = fingerprint(worktree_path, hook)
+        if cache.restore(key, worktree_path, hook):
+            duration = time.perf_counter() - start
+            console.print(
+                f"  [green]✓ {hook.name}[/green] [dim](cached, {duration:.1f}s)[/dim]"
+            )
+            return HookResult(hook.name, True, "cached", duration, 0)
+
+    hook_path = worktree_path / hook.run
+
+    if hook_path.exists():
+        cmd = [str(hook_path)]
+    else:
+        cmd = shlex.split(hook.run)
+
+    console.print(f"  [dim]Running: {hook.name}[/dim]")
+
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_file = log_path(log_dir, hook)
+    recent: deque[str] = deque(maxlen=FAILURE_LINES)
+    timed_out = threading.Event()
+
+    start = time.perf_counter()
+    with open(log_file, "wb") as log:
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                cwd=worktree_path,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                shell=False,
+                # Its own process group, so a timeout also kills the
+                # children that would otherwise keep the output pipe open.
+                start_new_session=True,
+            )
+        except OSError as e:
+            duration = time.perf_counter() - start
+            console.print(f"  [red]✗ {hook.name} ({e.strerror})[/red]")
+            return HookResult(hook.name, False, "failed", duration, log_path=log_file)
+
+        def kill() -> None:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                return
+            timed_out.set()
+
+        timer = None
+        if hook.timeout is not None:
+            timer = threading.Timer(hook.timeout, kill)
+            timer.start()
+        if tail is not None:
+            tail.start(hook.name)
+
+        try:
+            for raw in iter(lambda: proc.stdout.readline(MAX_LINE), b""):
+                log.write(raw)
+                line = raw.decode(errors="replace").rstrip()
+                recent.append(line)
+                if tail is not None:
+                    tail.push(hook.name, line)
+            returncode = proc.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if proc.poll() is None:
+                kill()
+            if tail is not None:
+                tail.stop(hook.name)
+            proc.stdout.close()
+    duration = time.perf_counter() - start
+
+    if timed_out.is_set():
+        console.print(f"  [red]✗ {hook.name} (timed out after {hook.timeout}s)[/red]")
+        status = "timeout"
+    elif returncode == 0:
+        console.print(f"  [green]✓ {hook.name}[/green] [dim]({duration:.1f}s)[/dim]")
+        if key is not None:
+            cache.save(key, worktree_path, hook)
+        return HookResult(hook.name, True, "ok", duration, 0, log_file)
+    else:
+        console.print(
+            f"  [red]✗ {hook.name} (exit {returncode})[/red] "
+            f"[dim]({duration:.1f}s)[/dim]"
         )
+        status = "failed"
+
+    from rich.markup import escape
+
+    for line in recent:
+        console.print(f"    [dim]{escape(line)}[/dim]")
+    console.print(f"    [dim]Full log: {log_file}[/dim]")
+    return HookResult(hook.name, False, status, duration, returncode, log_file)
+
+
+def _run_hook_traced(worktree_path: Path, hook: Hook, *args) -> HookResult:
+    with tracing.span(
+        f"hook {hook.name}", "hook", run=hook.run, cwd=worktree_path
+    ) as info:
+        result = _run_hook(worktree_path, hook, *args)
+        info["status"] = result.status
+        info["exit_code"] = result.returncode
+        if result.log_path is not None and result.log_path.exists():
+            info["output_bytes"] = result.log_path.stat().st_size
+    return result
+
+
+def run_hooks(
+    worktree_path: Path,
+    hooks: list[Hook],
+    console: "Console",
+    jobs: int = 1,
+    cache: HookCache | None = None,
+    live: bool = True,
+) -> list[HookResult]:
+    """Run hooks as a dependency graph with at most ``jobs`` running at once.
+
+    A hook starts once every hook named in its ``after`` list has succeeded.
+    Hooks whose dependencies fail, are unknown or form a cycle are skipped.
+    Results are returned in declaration order.
+
+    Hooks that declare ``inputs`` and ``outputs`` are looked up in ``cache``
+    first and restore their outputs instead of running on a hit.
+
+    Output is streamed to a log file per hook under the worktree's git dir.
+    With ``live``, the last few lines of each running hook are shown below
+    the results.
+    """
+    log_dir = git.get_git_dir(cwd=worktree_path) / "git-wt" / "logs"
+    tail = HookTail() if live and console.is_terminal else None
+    results: dict[str, HookResult] = {}
+    pending = list(hooks)
+    running: dict[Future, Hook] = {}
+    limit = max(1, jobs)
+    start = time.perf_counter()
+
+    if tail is not None:
+        from rich.live import Live
+
+        display = Live(tail, console=console, transient=True)
+    else:
+        display = nullcontext()
+    with display, ThreadPoolExecutor(max_workers=limit) as pool:
+        while pending or running:
+            skipped_any = False
+            for hook in list(pending):
+                deps = [results.get(d) for d in hook.after]
+                if any(r is not None and not r.ok for r in deps):
+                    console.print(f"  [yellow]- {hook.name} (skipped)[/yellow]")
+                    results[hook.name] = HookResult(hook.name, False, "skipped")
+                    pending.remove(hook)
+                    skipped_any = True
+                elif all(r is not None for r in deps) and len(running) < limit:
+                    future = pool.submit(
+                        _run_hook_traced,
+                        worktree_path,
+                        hook,
+                        console,
+                        cache,
+                        log_dir,
+                        tail,
+                    )
+                    running[future] = hook
+                    pending.remove(hook)
+
+            if not running:
+                if skipped_any:
+                    continue
+                for hook in pending:
+                    console.print(
+                        f"  [yellow]- {hook.name} (unmet dependencies)[/yellow]"
+                    )
+                    results[hook.name] = HookResult(hook.name, False, "skipped")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                hook = running.pop(future)
+                results[hook.name] = future.result()
+
+    if len(hooks) > 1:
+        wall = time.perf_counter() - start
+        total = sum(r.duration for r in results.values())
+        console.print(f"  [dim]Hooks took {wall:.1f}s ({total:.1f}s of work)[/dim]")
 
-        if result.returncode == 0:
-            console.print(f"  [green]✓ {hook}[/green]")
-            results.append((hook, True))
-        else:
-            console.print(f"  [red]✗ {hook} (exit {result.returncode})[/red]")
-            if result.stderr:
-                for line in result.stderr.strip().split("\n")[:5]:
-                    console.print(f"    [dim]{line}[/dim]")
-            results.append((hook, False))
-
-    return results
+    return [results[h.name] for h in hooks if h.name in results]
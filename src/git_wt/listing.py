@@ -0,0 +1,115 @@
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+from . import daemon, git, pool
+from .config import Config
+from .gc import default_base
+from .status import StatusCache, worktree_status_async
+
+
+@dataclass
+class ListRecord:
+    path: str
+    branch: str | None
+    head: str
+    sha: str | None
+    subject: str | None
+    date: str | None
+    status: str
+    base: str
+    ahead: int | None
+    behind: int | None
+    detached: bool
+    locked: bool
+    prunable: bool
+
+
+def load_entries(repo_root: Path) -> list[tuple[git.Worktree, str | None]]:
+    """Worktrees other than pool spares, with the status a running daemon
+    already knows for each (None where it does not, or without a daemon).
+    """
+    reply = daemon.request({"cmd": "list"}, cwd=repo_root)
+    if reply is not None:
+        entries = [
+            (daemon.worktree_from_dict(d), d.get("status")) for d in reply["worktrees"]
+        ]
+    else:
+        entries = [(wt, None) for wt in git.get_worktrees(cwd=repo_root)]
+    return [(wt, s) for wt, s in entries if not pool.is_spare(wt.path, repo_root)]
+
+
+async def _commits(heads: list[str], repo_root: Path) -> dict[str, git.Commit]:
+    try:
+        return await git.get_commits_async(heads, cwd=repo_root)
+    except git.GitError:
+        return {}
+
+
+def iter_records(
+    repo_root: Path,
+    config: Config,
+    entries: list[tuple[git.Worktree, str | None]] | None = None,
+) -> Iterator[ListRecord]:
+    """Describe each worktree, yielding records as their status probes finish.
+
+    Commit details for all worktrees come from one ``git log`` and
+    ahead/behind counts versus the default branch from one ``for-each-ref``,
+    run together. Git before 2.41 cannot count in for-each-ref, and detached
+    worktrees have no ref to count, so those are counted per worktree
+    alongside its status probe.
+    """
+    if entries is None:
+        entries = load_entries(repo_root)
+    if not entries:
+        return
+
+    base = default_base(repo_root)
+    commits, counts = git.run_all(
+        [
+            _commits([wt.head for wt, _ in entries], repo_root),
+            git.count_ahead_behind_async(
+                base, [wt.branch for wt, _ in entries if wt.branch], cwd=repo_root
+            ),
+        ]
+    )
+    cache = StatusCache.for_repo(config.status_cache_ttl, cwd=repo_root)
+
+    async def describe(wt: git.Worktree, status: str | None) -> ListRecord:
+        if status is None:
+            status = await worktree_status_async(
+                wt,
+                quick=config.status_mode == "quick",
+                timeout=config.status_timeout,
+                cache=cache,
+            )
+        ahead_behind = (counts or {}).get(wt.branch) if wt.branch else None
+        if ahead_behind is None and status in ("clean", "dirty"):
+            try:
+                ahead_behind = await git.get_ahead_behind_async(
+                    wt.path, timeout=config.status_timeout, base=base
+                )
+            except git.GitTimeoutError:
+                pass
+        ahead, behind = ahead_behind or (None, None)
+        commit = commits.get(wt.head)
+        return ListRecord(
+            path=str(wt.path),
+            branch=wt.branch,
+            head=wt.head,
+            sha=commit.short if commit else None,
+            subject=commit.subject if commit else None,
+            date=commit.date if commit else None,
+            status=status,
+            base=base,
+            ahead=ahead,
+            behind=behind,
+            detached=wt.is_detached,
+            locked=wt.is_locked,
+            prunable=wt.is_prunable,
+        )
+
+    calls = [partial(describe, wt, status) for wt, status in entries]
+    for _, record in git.iter_completed(calls, config.status_workers):
+        yield record
@@ -0,0 +1,178 @@
+from pathlib import Path
+import os
+import re
+
+from . import git
+from .config import Config
+
+GLOB_CHARS = frozenset("*?[")
+
+
+def is_glob(pattern: str) -> bool:
+    return any(c in GLOB_CHARS for c in pattern)
+
+
+def _translate(pattern: str) -> str:
+    """Regex for a gitignore-style glob, matching a path or anything under it.
+
+    ``*`` and ``?`` stay within one path component and ``**`` crosses them.
+    A pattern without a ``/`` matches at any depth, like in ``.gitignore``;
+    one with a ``/`` is relative to the repository root.
+    """
+    pattern = pattern.rstrip("/")
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and (end := pattern.find("]", i + 2)) != -1:
+            body = pattern[i + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = end + 1
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    prefix = "" if anchored else "(?:.*/)?"
+    return f"{prefix}{''.join(out)}(?:/.*)?"
+
+
+def compile_patterns(patterns: list[str]) -> re.Pattern | None:
+    """One regex for all ``patterns``; group ``n`` is set when pattern ``n-1``
+    matched, so a single ``fullmatch`` per path tells which one did.
+    """
+    if not patterns:
+        return None
+    return re.compile("|".join(f"({_translate(p)})" for p in patterns))
+
+
+def _literal_prefix(pattern: str) -> str:
+    """The leading directories of an anchored pattern that contain no glob,
+    e.g. ``packages/`` for ``packages/*/.env``; empty if it may match anywhere.
+    """
+    pattern = pattern.rstrip("/")
+    if "/" not in pattern:
+        return ""
+    parts = pattern.lstrip("/").split("/")
+    prefix = []
+    for part in parts[:-1]:
+        if is_glob(part):
+            break
+        prefix.append(part + "/")
+    return "".join(prefix)
+
+
+def _without_excluded(root: Path, path: str, skip: re.Pattern) -> list[str]:
+    """``path`` if nothing under it matches ``skip``, otherwise the largest
+    pieces of it that do not, so an excluded tree is never synced as part of
+    a directory git reported whole.
+    """
+    pieces = []
+    pruned = False
+    try:
+        with os.scandir(root / path) as it:
+            children = [(e.name, e.is_dir(follow_symlinks=False)) for e in it]
+    except OSError:
+        return [path]
+    for name, is_dir in children:
+        child = f"{path}/{name}"
+        if skip.fullmatch(child):
+            pruned = True
+        elif is_dir:
+            inner = _without_excluded(root, child, skip)
+            pruned = pruned or inner != [child]
+            pieces.extend(inner)
+        else:
+            pieces.append(child)
+    return pieces if pruned else [path]
+
+
+def expand_paths(
+    root: Path,
+    patterns: list[str],
+    include_ignored: bool = False,
+    exclude: list[str] | None = None,
+) -> tuple[list[str], list[str]]:
+    """Resolve ``files.paths`` entries to the paths to sync.
+
+    Literal entries are returned as they are. Glob entries, and with
+    ``include_ignored`` every ignored file, are matched against a single
+    streamed ``git ls-files`` of ignored files. Git reports a wholly ignored
+    directory as one entry; it is synced as a whole when it matches, unless
+    something inside it is excluded, and only scanned for globs that could
+    match inside it. Anything matching ``exclude``, such as ``node_modules``,
+    is skipped without being looked into. Returns the paths and the globs
+    that matched nothing.
+    """
+    literals = [p for p in patterns if not is_glob(p)]
+    globs = [p for p in patterns if is_glob(p)]
+    if not globs and not include_ignored:
+        return literals, []
+
+    include = compile_patterns(globs)
+    skip = compile_patterns(exclude or [])
+    prefixes = [_literal_prefix(p) for p in globs]
+    matched: set[int] = set()
+    found = []
+
+    def may_contain(directory: str) -> bool:
+        directory += "/"
+        return any(p.startswith(directory) or directory.startswith(p) for p in prefixes)
+
+    pending: list[tuple[str, bool]] = []
+    for entry in git.iter_ignored_files(cwd=root):
+        pending.append((entry.rstrip("/"), entry.endswith("/")))
+        while pending:
+            path, is_dir = pending.pop()
+            if skip is not None and skip.fullmatch(path):
+                continue
+            match = include.fullmatch(path) if include is not None else None
+            if match is not None:
+                matched.add(match.lastindex)
+            elif is_dir and not include_ignored and may_contain(path):
+                try:
+                    with os.scandir(root / path) as it:
+                        pending.extend(
+                            (f"{path}/{e.name}", e.is_dir(follow_symlinks=False))
+                            for e in it
+                        )
+                except OSError:
+                    pass
+                continue
+            elif not include_ignored:
+                continue
+            if is_dir and skip is not None:
+                found.extend(_without_excluded(root, path, skip))
+            else:
+                found.append(path)
+
+    # Only the first matching pattern is recorded per path, so check the
+    # others against what was found before reporting them as unmatched.
+    unmatched = [
+        p
+        for i, p in enumerate(globs, 1)
+        if i not in matched
+        and not any(re.fullmatch(_translate(p), path) for path in found)
+    ]
+    return list(dict.fromkeys(literals + found)), unmatched
+
+
+def resolve_paths(root: Path, config: Config) -> tuple[list[str], list[str]]:
+    return expand_paths(
+        root, config.file_paths, config.include_ignored, config.file_exclude
+    )
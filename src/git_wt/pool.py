@@ -0,0 +1,177 @@
+from pathlib import Path
+import fcntl
+import os
+import subprocess
+import sys
+import uuid
+from typing import TYPE_CHECKING
+
+from . import git, store, sync, tracing, worktree
+from .config import Config
+from .hooks import hook_cache, run_hooks
+from .patterns import resolve_paths
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+# Each spare worktree has a marker file next to it in the pool directory. The
+# marker's suffix is its state, and claiming is an atomic rename of the marker.
+READY = ".ready"
+WARMING = ".warming"
+
+
+def pool_dir(repo_root: Path) -> Path:
+    return repo_root.parent / f".{repo_root.name}-pool"
+
+
+def is_spare(path: Path, repo_root: Path) -> bool:
+    return path.parent == pool_dir(repo_root)
+
+
+def ready_spares(repo_root: Path) -> list[Path]:
+    root = pool_dir(repo_root)
+    if not root.exists():
+        return []
+    return sorted(
+        root / p.name.removesuffix(READY) for p in root.glob(f"spare-*{READY}")
+    )
+
+
+def claim(
+    repo_root: Path,
+    branch: str,
+    worktree_path: Path,
+    new_branch: bool,
+    base: str | None,
+) -> bool:
+    """Switch a ready spare to ``branch`` and move it to ``worktree_path``.
+
+    Returns False if no spare could be claimed, in which case the caller
+    should create the worktree from scratch.
+    """
+    for spare in ready_spares(repo_root):
+        marker = spare.with_name(spare.name + READY)
+        claimed = spare.with_name(f"{spare.name}.claimed-{os.getpid()}")
+        try:
+            os.rename(marker, claimed)
+        except FileNotFoundError:
+            continue
+
+        try:
+            git.checkout(branch, cwd=spare, new_branch=new_branch, base=base)
+        except git.GitError:
+            os.rename(claimed, marker)
+            return False
+
+        manifest = sync.manifest_path(store.get_store_root(cwd=repo_root), spare)
+        try:
+            git.move_worktree(spare, worktree_path, cwd=repo_root)
+        except git.GitError:
+            # E.g. the pool is on another filesystem. The spare is on the
+            # branch now, so it is dropped, along with a branch it created.
+            _discard(spare, repo_root)
+            if new_branch:
+                try:
+                    git.delete_branches([branch], cwd=repo_root)
+                except git.GitError:
+                    pass
+            return False
+        claimed.unlink()
+        # Manifests are keyed by path; carry the spare's over so the files
+        # synced while warming are known to be untouched.
+        try:
+            os.replace(manifest, sync.manifest_path(manifest.parents[1], worktree_path))
+        except FileNotFoundError:
+            pass
+        return True
+
+    return False
+
+
+def _discard(spare: Path, repo_root: Path) -> None:
+    try:
+        git.remove_worktree(spare, force=True, cwd=repo_root)
+    except git.GitError:
+        pass
+    for marker in spare.parent.glob(f"{spare.name}.*"):
+        marker.unlink()
+
+
+def fill(repo_root: Path, config: Config, console: "Console | None" = None) -> int:
+    """Create spares until the pool holds ``config.pool_size`` ready worktrees.
+
+    Only one filler runs per repo at a time; returns the number created.
+    """
+    root = pool_dir(repo_root)
+    root.mkdir(exist_ok=True)
+    if console is None:
+        from rich.console import Console
+
+        console = Console(quiet=True)
+
+    with open(root / ".fill.lock", "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return 0
+
+        # Holding the lock means no other filler is alive, so anything still
+        # warming was left behind by a crash.
+        for marker in root.glob(f"spare-*{WARMING}"):
+            _discard(root / marker.name.removesuffix(WARMING), repo_root)
+
+        base = git.get_default_branch(cwd=repo_root)
+        paths, _ = resolve_paths(repo_root, config)
+        created = 0
+        while len(ready_spares(repo_root)) < config.pool_size:
+            spare = root / f"spare-{uuid.uuid4().hex[:8]}"
+            marker = spare.with_name(spare.name + WARMING)
+            marker.touch()
+            try:
+                git.add_worktree(spare, base, cwd=repo_root, detach=True)
+                synced = worktree.sync_files(
+                    repo_root,
+                    spare,
+                    paths,
+                    config.file_mode,
+                    workers=config.file_workers,
+                ).synced
+                if config.file_mode != "symlink":
+                    sync.record_baseline(repo_root, spare, synced)
+                results = run_hooks(
+                    spare,
+                    config.post_create_hooks,
+                    console,
+                    jobs=config.hook_jobs,
+                    cache=hook_cache(repo_root, config),
+                    live=False,
+                )
+            except (git.GitError, OSError):
+                _discard(spare, repo_root)
+                break
+            if not all(r.ok for r in results):
+                _discard(spare, repo_root)
+                break
+            os.rename(marker, spare.with_name(spare.name + READY))
+            created += 1
+
+    return created
+
+
+def drain(repo_root: Path) -> int:
+    spares = ready_spares(repo_root)
+    for spare in spares:
+        _discard(spare, repo_root)
+    return len(spares)
+
+
+def refill_in_background(repo_root: Path) -> None:
+    subprocess.Popen(
+        [sys.executable, "-m", "git_wt.cli", "pool", "fill"],
+        cwd=repo_root,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={k: v for k, v in os.environ.items() if k != tracing.ENV_VAR},
+        start_new_session=True,
+    )
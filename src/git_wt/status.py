@@ -0,0 +1,189 @@
+from collections.abc import Iterator
+from functools import partial
+from pathlib import Path
+import hashlib
+import json
+import os
+import time
+import uuid
+
+from . import git
+from .git import Worktree
+
+STATUS_STYLES = {
+    "bare": "bare",
+    "missing": "[red]missing[/red]",
+    "dirty": "[yellow]dirty[/yellow]",
+    "clean": "[green]clean[/green]",
+    "timeout": "[red]timeout[/red]",
+}
+
+
+def status_token(git_dir: Path, common_dir: Path, worktree_path: Path) -> list | None:
+    """Stat-based fingerprint of the state ``git status`` depends on.
+
+    Covers the index, HEAD, the ref HEAD points at and the worktree's top-level
+    directory (so files created or deleted there are noticed). Edits to
+    tracked files that have not been staged do not change it, which is why
+    cached entries also expire.
+    """
+    try:
+        index = os.stat(git_dir / "index")
+        head = (git_dir / "HEAD").read_text().strip()
+        root = os.stat(worktree_path)
+    except OSError:
+        return None
+    token = [index.st_mtime_ns, index.st_size, head, root.st_mtime_ns]
+    if head.startswith("ref: "):
+        for ref in (common_dir / head[len("ref: ") :], common_dir / "packed-refs"):
+            try:
+                token.append(os.stat(ref).st_mtime_ns)
+                break
+            except OSError:
+                continue
+    return token
+
+
+class StatusCache:
+    """Last known status of each worktree, keyed by its git dir."""
+
+    def __init__(self, root: Path, ttl: float):
+        self.root = root
+        self.ttl = ttl
+
+    @classmethod
+    def for_common_dir(cls, common_dir: Path, ttl: float) -> "StatusCache":
+        from .store import state_dir
+
+        return cls(state_dir(common_dir) / "status", ttl)
+
+    @classmethod
+    def for_repo(cls, ttl: float, cwd: Path | None = None) -> "StatusCache":
+        return cls.for_common_dir(git.get_common_dir(cwd=cwd), ttl)
+
+    def _entry_path(self, git_dir: Path) -> Path:
+        return self.root / f"{hashlib.sha1(str(git_dir).encode()).hexdigest()}.json"
+
+    def get(self, git_dir: Path, token: list) -> str | None:
+        try:
+            entry = json.loads(self._entry_path(git_dir).read_text())
+        except (OSError, ValueError):
+            return None
+        if entry.get("token") != token or time.time() >= entry.get("expires", 0):
+            return None
+        return entry.get("status")
+
+    def put(self, git_dir: Path, token: list, status: str) -> None:
+        if self.ttl <= 0:
+            return
+        entry = {"token": token, "status": status, "expires": time.time() + self.ttl}
+        path = self._entry_path(git_dir)
+        tmp = self.root / f".tmp-{uuid.uuid4().hex}"
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(entry))
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+
+async def worktree_status_async(
+    wt: Worktree,
+    quick: bool = False,
+    timeout: float | None = None,
+    cache: StatusCache | None = None,
+) -> str:
+    if wt.is_bare:
+        return "bare"
+    if not wt.path.exists():
+        return "missing"
+
+    dirs = git.discover_git_dirs(wt.path) if cache is not None else None
+    if dirs is not None:
+        token = status_token(*dirs, wt.path)
+        if token is not None:
+            status = cache.get(dirs[0], token)
+            if status is not None:
+                return status
+
+    try:
+        dirty = await git.is_dirty_async(wt.path, quick=quick, timeout=timeout)
+    except git.GitTimeoutError:
+        return "timeout"
+    status = "dirty" if dirty else "clean"
+
+    # git status may refresh the index, so the token is taken afterwards.
+    if dirs is not None:
+        token = status_token(*dirs, wt.path)
+        if token is not None:
+            cache.put(dirs[0], token, status)
+    return status
+
+
+def worktree_status(
+    wt: Worktree,
+    quick: bool = False,
+    timeout: float | None = None,
+    cache: StatusCache | None = None,
+) -> str:
+    return git.run_sync(worktree_status_async(wt, quick, timeout, cache))
+
+
+def current_status(cwd: Path | None = None) -> str | None:
+    """Status of the worktree containing ``cwd``, answered from the cache if
+    possible. Returns None outside a worktree.
+    """
+    dirs = git.discover_git_dirs(cwd)
+    if dirs is not None:
+        git_dir, common_dir = dirs
+        if git_dir == common_dir:
+            path = common_dir.parent
+        else:
+            try:
+                path = Path((git_dir / "gitdir").read_text().strip()).parent
+            except OSError:
+                return None
+        token = status_token(git_dir, common_dir, path)
+        cache = StatusCache.for_common_dir(common_dir, 0)
+        if token is not None and (status := cache.get(git_dir, token)):
+            return status
+
+        from . import daemon
+
+        reply = daemon.request({"cmd": "status", "path": str(path)}, cwd=path)
+        if reply is not None and reply.get("status"):
+            return reply["status"]
+    else:
+        try:
+            path = git.get_repo_root(cwd=cwd)
+        except git.GitError:
+            return None
+
+    from .config import load_config
+
+    config = load_config(git.get_main_worktree(cwd=path))
+    cache = StatusCache.for_repo(config.status_cache_ttl, cwd=path)
+    wt = Worktree(path=path, head="", branch=None)
+    return worktree_status(
+        wt,
+        quick=config.status_mode == "quick",
+        timeout=config.status_timeout,
+        cache=cache,
+    )
+
+
+def iter_statuses(
+    worktrees: list[Worktree],
+    quick: bool = False,
+    workers: int = 8,
+    timeout: float | None = None,
+    cache: StatusCache | None = None,
+) -> Iterator[tuple[int, str]]:
+    """Probe worktrees concurrently, yielding ``(index, status)`` as each finishes."""
+    return git.iter_completed(
+        [
+            partial(worktree_status_async, wt, quick, timeout, cache)
+            for wt in worktrees
+        ],
+        workers,
+    )
@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from pathlib import Path
+import errno
+import hashlib
+import os
+import stat
+import time
+import uuid
+
+from . import git
+from .copier import clone_file
+
+STORE_DIRNAME = "git-wt"
+WRITE_BITS = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+
+
+@dataclass
+class LinkStats:
+    files: int = 0
+    bytes_total: int = 0
+    bytes_deduped: int = 0
+
+
+def state_dir(common_dir: Path) -> Path:
+    """Directory for git-wt state under the repository's ``common_dir``."""
+    return common_dir / STORE_DIRNAME
+
+
+def get_store_root(cwd: Path | None = None) -> Path:
+    """Per-repo directory for git-wt state, shared by all worktrees."""
+    return state_dir(git.get_common_dir(cwd=cwd))
+
+
+def hash_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ObjectStore:
+    """Content-addressed file store whose objects are hardlinked into worktrees.
+
+    Objects are keyed by content hash plus the executable bit, since hardlinks
+    share a single inode and therefore a single mode.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    @classmethod
+    def for_repo(cls, cwd: Path | None = None) -> "ObjectStore":
+        return cls(get_store_root(cwd=cwd) / "objects")
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:]
+
+    def add(self, source: Path) -> tuple[Path, bool]:
+        """Store a file, returning its object path and whether it already existed.
+
+        Objects are read-only, so editors and tools replace a linked file
+        rather than write through to every worktree sharing it. An existing
+        object that has been made writable or changed size since is rehashed,
+        and replaced if its content no longer matches its name.
+        """
+        st = source.stat()
+        digest = hash_file(source)
+        if st.st_mode & stat.S_IXUSR:
+            digest += "x"
+
+        obj = self.object_path(digest)
+        try:
+            obj_st = obj.stat()
+        except FileNotFoundError:
+            obj_st = None
+        if obj_st is not None:
+            intact = not obj_st.st_mode & WRITE_BITS and obj_st.st_size == st.st_size
+            if intact or hash_file(obj) == digest.rstrip("x"):
+                if not intact:
+                    os.chmod(obj, stat.S_IMODE(obj_st.st_mode) & ~WRITE_BITS)
+                return obj, True
+
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp = obj.parent / f".tmp-{uuid.uuid4().hex}"
+        clone_file(source, tmp)
+        os.chmod(tmp, stat.S_IMODE(st.st_mode) & ~WRITE_BITS)
+        os.replace(tmp, obj)
+        return obj, False
+
+    def link(self, source: Path, target: Path, stats: LinkStats) -> None:
+        obj, existed = self.add(source)
+        if target.exists() or target.is_symlink():
+            target.unlink()
+        try:
+            os.link(obj, target)
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EMLINK, errno.EPERM):
+                raise
+            # A private copy need not be protected like the shared object.
+            clone_file(obj, target)
+            os.chmod(target, stat.S_IMODE(source.stat().st_mode))
+            existed = False
+
+        size = obj.stat().st_size
+        stats.files += 1
+        stats.bytes_total += size
+        if existed:
+            stats.bytes_deduped += size
+
+    def prune(self) -> tuple[int, int]:
+        """Delete objects no longer linked into any worktree.
+
+        Returns the number of objects removed and the bytes freed.
+        """
+        removed = 0
+        freed = 0
+        if not self.root.exists():
+            return removed, freed
+
+        for bucket in os.scandir(self.root):
+            if not bucket.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(bucket.path):
+                st = entry.stat(follow_symlinks=False)
+                if entry.name.startswith(".tmp-"):
+                    stale = st.st_mtime < time.time() - 3600
+                else:
+                    stale = st.st_nlink == 1
+                if stale:
+                    os.unlink(entry.path)
+                    removed += 1
+                    freed += st.st_size
+
+        return removed, freed
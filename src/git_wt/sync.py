@@ -0,0 +1,290 @@
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+
+from . import git, tracing
+from .config import Config
+from .console import get_console
+from .copier import clone_file
+from .patterns import resolve_paths
+from .store import LinkStats, ObjectStore, get_store_root, hash_file
+
+
+@dataclass
+class SourceFile:
+    rel: str
+    path: Path
+    size: int
+    mtime_ns: int
+    link: str | None = None
+
+
+@dataclass
+class SyncReport:
+    path: Path
+    updated: list[str] = field(default_factory=list)
+    conflicts: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+def manifest_path(store_root: Path, worktree_path: Path) -> Path:
+    key = hashlib.sha1(str(worktree_path.resolve()).encode()).hexdigest()[:16]
+    return store_root / "sync" / f"{key}.json"
+
+
+def load_manifest(path: Path) -> dict[str, list]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path: Path, manifest: dict[str, list]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+def scan_sources(source_root: Path, paths: list[str]) -> list[SourceFile]:
+    files = []
+
+    def add(path: Path, rel: str) -> None:
+        st = os.lstat(path)
+        link = os.readlink(path) if os.path.islink(path) else None
+        files.append(SourceFile(rel, path, st.st_size, st.st_mtime_ns, link))
+
+    for path_str in paths:
+        source = source_root / path_str
+        if not source.exists():
+            continue
+        if not source.is_dir():
+            add(source, path_str)
+            continue
+        stack = [source]
+        while stack:
+            current = stack.pop()
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    else:
+                        path = Path(entry.path)
+                        add(path, path.relative_to(source_root).as_posix())
+
+    return files
+
+
+class _Digests:
+    """Content hashes of source files, computed at most once per run."""
+
+    def __init__(self) -> None:
+        self._digests: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, f: SourceFile) -> str:
+        with self._lock:
+            if f.rel in self._digests:
+                return self._digests[f.rel]
+        digest = f"link:{f.link}" if f.link is not None else hash_file(f.path)
+        with self._lock:
+            self._digests[f.rel] = digest
+        return digest
+
+
+def _copy_function(mode: str, source_root: Path) -> Callable[[Path, Path], None]:
+    if mode == "hardlink":
+        store = ObjectStore.for_repo(cwd=source_root)
+        return lambda src, dst: store.link(src, dst, LinkStats())
+    if mode == "reflink":
+        return clone_file
+    return shutil.copy2
+
+
+def _same_content(
+    target: Path, st: os.stat_result, f: SourceFile, digests: _Digests
+) -> bool:
+    if f.link is not None:
+        return stat.S_ISLNK(st.st_mode) and os.readlink(target) == f.link
+    if not stat.S_ISREG(st.st_mode) or st.st_size != f.size:
+        return False
+    return hash_file(target) == digests.get(f)
+
+
+def sync_worktree(
+    target_root: Path,
+    files: list[SourceFile],
+    digests: _Digests,
+    copy: Callable[[Path, Path], None],
+    store_root: Path,
+    force: bool = False,
+) -> SyncReport:
+    """Bring ``target_root``'s copies of ``files`` up to date.
+
+    The manifest records each file's source stat and digest along with the
+    target's stat right after it was written. A target whose stat no longer
+    matches was edited in the worktree, and one without a manifest entry may
+    have been, so unless ``force`` is set those are left alone and reported
+    as conflicts when they differ from the source.
+    """
+    report = SyncReport(target_root)
+    mpath = manifest_path(store_root, target_root)
+    manifest = load_manifest(mpath)
+
+    try:
+        for f in files:
+            target = target_root / f.rel
+            entry = manifest.get(f.rel)
+            try:
+                st = os.lstat(target)
+            except FileNotFoundError:
+                st = None
+
+            digest = None
+            if st is not None:
+                written = entry is not None and len(entry) == 5
+                if written and entry[3:] == [st.st_size, st.st_mtime_ns]:
+                    if entry[:2] == [f.size, f.mtime_ns]:
+                        continue
+                    digest = digests.get(f)
+                    if entry[2] == digest:
+                        manifest[f.rel] = [f.size, f.mtime_ns, *entry[2:]]
+                        continue
+                elif not force:
+                    if not _same_content(target, st, f, digests):
+                        report.conflicts.append(f.rel)
+                        continue
+                    manifest[f.rel] = [
+                        f.size,
+                        f.mtime_ns,
+                        digests.get(f),
+                        st.st_size,
+                        st.st_mtime_ns,
+                    ]
+                    continue
+
+            if digest is None:
+                digest = digests.get(f)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if st is not None:
+                target.unlink()
+            if f.link is not None:
+                os.symlink(f.link, target)
+            else:
+                copy(f.path, target)
+            written = os.lstat(target)
+            manifest[f.rel] = [
+                f.size,
+                f.mtime_ns,
+                digest,
+                written.st_size,
+                written.st_mtime_ns,
+            ]
+            report.updated.append(f.rel)
+    except OSError as e:
+        report.error = str(e)
+    finally:
+        save_manifest(mpath, manifest)
+
+    return report
+
+
+def record_baseline(source_root: Path, target_root: Path, paths: list[str]) -> None:
+    """Record the files just synced into a new worktree in its manifest, so
+    later syncs can tell them apart from edits made in the worktree.
+    """
+    store_root = get_store_root(cwd=source_root)
+    manifest = {}
+    for f in scan_sources(source_root, paths):
+        try:
+            st = os.lstat(target_root / f.rel)
+        except FileNotFoundError:
+            continue
+        # The digest is left for the first sync to compute if it needs it.
+        manifest[f.rel] = [f.size, f.mtime_ns, None, st.st_size, st.st_mtime_ns]
+    save_manifest(manifest_path(store_root, target_root), manifest)
+
+
+def sync_all(
+    source_root: Path,
+    targets: list[Path],
+    config: Config,
+    workers: int = 8,
+    force: bool = False,
+) -> Iterator[SyncReport]:
+    """Push changed synced files from ``source_root`` to every target worktree.
+
+    Files edited in a worktree are only overwritten with ``force``. Yields a
+    ``SyncReport`` per worktree as each one finishes.
+    """
+    with tracing.span("scan sources", "files", source=source_root) as info:
+        files = scan_sources(source_root, resolve_paths(source_root, config)[0])
+        info["files"] = len(files)
+    store_root = get_store_root(cwd=source_root)
+    copy = _copy_function(config.file_mode, source_root)
+    digests = _Digests()
+
+    def sync_one(target: Path) -> SyncReport:
+        with tracing.span("sync worktree", "files", target=target) as info:
+            report = sync_worktree(target, files, digests, copy, store_root, force)
+            info["updated"] = len(report.updated)
+        return report
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(targets)))) as pool:
+        futures = [pool.submit(sync_one, t) for t in targets]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def sync_worktrees(repo_root: Path, config: Config, force: bool = False) -> int:
+    """Sync every other worktree from ``repo_root``, printing one line for each."""
+    console = get_console()
+    if config.file_mode == "symlink":
+        console.print("[dim]Symlinked files are already shared; nothing to sync[/dim]")
+        return 0
+
+    targets = [
+        wt.path
+        for wt in git.get_worktrees(cwd=repo_root)
+        if not wt.is_bare and wt.path.exists() and wt.path != repo_root
+    ]
+    if not targets:
+        console.print("[yellow]No other worktrees to sync[/yellow]")
+        return 0
+
+    failed = False
+    conflicted = False
+    reports = sync_all(
+        repo_root, targets, config, workers=config.file_workers, force=force
+    )
+    for report in reports:
+        if report.error:
+            failed = True
+            console.print(f"[red]✗ {report.path}: {report.error}[/red]")
+            continue
+        if report.conflicts:
+            conflicted = True
+            shown = ", ".join(report.conflicts[:5])
+            if len(report.conflicts) > 5:
+                shown += f" (+{len(report.conflicts) - 5} more)"
+            console.print(
+                f"[yellow]! {report.path}: kept local changes to {shown}[/yellow]"
+            )
+        if report.updated:
+            shown = ", ".join(report.updated[:5])
+            if len(report.updated) > 5:
+                shown += f" (+{len(report.updated) - 5} more)"
+            console.print(f"[green]✓ {report.path}: {shown}[/green]")
+        elif not report.conflicts:
+            console.print(f"[dim]  {report.path}: up to date[/dim]")
+
+    if conflicted:
+        console.print("[dim]Run git wt sync --force to overwrite them[/dim]")
+    return 1 if failed or conflicted else 0
@@ -0,0 +1,123 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+import itertools
+import json
+import os
+import threading
+import time
+
+ENV_VAR = "GIT_WT_TRACE"
+DEFAULT_PATH = "git-wt-trace.json"
+
+# Recorded spans, or None while tracing is off. Checked before doing any work
+# so that the instrumented paths cost a single attribute lookup when disabled.
+_events: list[dict] | None = None
+_lock = threading.Lock()
+_origin = 0.0
+_async_ids = itertools.count(1)
+
+
+def enabled() -> bool:
+    return _events is not None
+
+
+def enable() -> None:
+    global _events, _origin
+    _events = []
+    _origin = time.perf_counter()
+
+
+def path_from_env() -> Path | None:
+    value = os.environ.get(ENV_VAR)
+    if not value or value == "0":
+        return None
+    return Path(DEFAULT_PATH if value == "1" else value)
+
+
+@contextmanager
+def span(name: str, category: str, **args) -> Iterator[dict]:
+    """Record how long the block takes; callers may add to the yielded args."""
+    if _events is None:
+        yield args
+        return
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        end = time.perf_counter()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - _origin) * 1e6),
+            "dur": round((end - start) * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {k: str(v) if isinstance(v, Path) else v for k, v in args.items()},
+        }
+        with _lock:
+            _events.append(event)
+
+
+@contextmanager
+def async_span(name: str, category: str, **args) -> Iterator[dict]:
+    """Like ``span``, for work that overlaps other spans on the same thread,
+    such as coroutines sharing an event loop.
+
+    Recorded as a begin/end pair with its own id, which trace viewers draw on
+    a separate track, since complete events on one thread must nest.
+    """
+    if _events is None:
+        yield args
+        return
+    event = {
+        "name": name,
+        "cat": category,
+        "id": next(_async_ids),
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+    }
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        end = time.perf_counter()
+        begin = {**event, "ph": "b", "ts": round((start - _origin) * 1e6)}
+        finish = {
+            **event,
+            "ph": "e",
+            "ts": round((end - _origin) * 1e6),
+            "args": {k: str(v) if isinstance(v, Path) else v for k, v in args.items()},
+        }
+        with _lock:
+            _events.extend((begin, finish))
+
+
+def write(path: Path) -> None:
+    """Write recorded spans as Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+    with _lock:
+        events = list(_events or [])
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+
+def summarize(limit: int = 10) -> list[tuple[str, int, float, float]]:
+    """Group spans by name: (name, calls, total ms, max ms), costliest first."""
+    totals: dict[str, list] = {}
+    begins: dict[int, int] = {}
+    with _lock:
+        for event in _events or []:
+            if event["ph"] == "b":
+                begins[event["id"]] = event["ts"]
+                continue
+            if event["ph"] == "e":
+                ms = (event["ts"] - begins.pop(event["id"])) / 1000
+            else:
+                ms = event["dur"] / 1000
+            entry = totals.setdefault(event["name"], [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += ms
+            entry[2] = max(entry[2], ms)
+    rows = [(name, n, total, peak) for name, (n, total, peak) in totals.items()]
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:limit]
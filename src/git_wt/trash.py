@@ -0,0 +1,165 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import fcntl
+import os
+import shutil
+import subprocess
+import sys
+import uuid
+
+from . import git, tracing
+
+TRASH_DIRNAME = ".git-wt-trash"
+LOCK_NAME = ".purge.lock"
+
+
+def trash_dir(worktree_path: Path) -> Path:
+    """Trash next to the worktree, so moving it there is a rename on one filesystem."""
+    return worktree_path.parent / TRASH_DIRNAME
+
+
+def admin_dir(worktree_path: Path) -> Path:
+    """The worktree's entry under ``<common-dir>/worktrees``, from its ``.git`` file."""
+    dotgit = worktree_path / ".git"
+    if not dotgit.is_file():
+        raise git.GitError(f"Not a linked worktree: {worktree_path}")
+    content = dotgit.read_text().strip()
+    if not content.startswith("gitdir: "):
+        raise git.GitError(f"Unrecognized .git file in {worktree_path}")
+    return (worktree_path / content[len("gitdir: ") :]).resolve()
+
+
+def remove(worktree_path: Path, force: bool = False, cwd: Path | None = None) -> None:
+    """Remove a worktree by renaming it into the trash and dropping its admin dir.
+
+    Returns as soon as the worktree is gone from git's records and its path is
+    free; the files are deleted by a background ``purge``. Falls back to
+    ``git worktree remove`` when the trash would be on another filesystem.
+    Like git, refuses locked worktrees and, without ``force``, worktrees
+    with modified or untracked files.
+    """
+    admin = admin_dir(worktree_path)
+    if (admin / "locked").exists():
+        raise git.GitError(f"Worktree is locked: {worktree_path}")
+    if not force and git.is_dirty(worktree_path):
+        raise git.GitError(
+            f"{worktree_path} contains modified or untracked files, use --force"
+        )
+
+    if not move_to_trash(worktree_path):
+        git.remove_worktree(worktree_path, force=force, cwd=cwd)
+        return
+    with git.admin_lock(cwd):
+        shutil.rmtree(admin, ignore_errors=True)
+    purge_in_background(trash_dir(worktree_path))
+
+
+def move_to_trash(path: Path) -> bool:
+    """Rename ``path`` into its trash dir; False if that would cross filesystems."""
+    if os.stat(path.parent).st_dev != os.stat(path).st_dev:
+        return False
+    trash = trash_dir(path)
+    with tracing.span("move to trash", "files", path=path):
+        while True:
+            trash.mkdir(exist_ok=True)
+            try:
+                os.rename(path, trash / f"{uuid.uuid4().hex}-{path.name}")
+            except FileNotFoundError:
+                # A purge that just emptied the trash removed it; recreate it.
+                if not path.exists():
+                    raise
+                continue
+            return True
+
+
+def _expand(roots: list[Path], target: int) -> tuple[list[Path], list[Path]]:
+    """Split trees into at least ``target`` subtrees where possible.
+
+    Returns the subtrees plus the directories that were split open, which
+    are left for the caller to remove once their subtrees are gone.
+    """
+    units = list(roots)
+    opened: list[Path] = []
+    i = 0
+    while len(units) < target and i < len(units):
+        path = units[i]
+        if path.is_dir() and not path.is_symlink():
+            children = [Path(e.path) for e in os.scandir(path)]
+            units[i : i + 1] = children
+            opened.append(path)
+        else:
+            i += 1
+    return units, opened
+
+
+def _delete(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def _entries(trash: Path) -> set[Path]:
+    try:
+        return {Path(e.path) for e in os.scandir(trash) if e.name != LOCK_NAME}
+    except FileNotFoundError:
+        return set()
+
+
+def purge(trash: Path, workers: int = 8) -> bool:
+    """Delete everything in ``trash``, splitting large trees across threads.
+
+    Holds a lock so only one purge runs per trash dir. Entries stay in the
+    trash until they are fully deleted, so an interrupted purge simply
+    resumes on the next run, and the trash dir itself is removed once empty.
+    Returns False if another purge holds the lock.
+    """
+    previous = None
+    while True:
+        # The lock is released between rounds: a worktree trashed while it
+        # was held had its own purge give up, so the next round picks it up.
+        try:
+            lock = open(trash / LOCK_NAME, "w")
+        except FileNotFoundError:
+            return True
+        with lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            entries = _entries(trash)
+            if not entries:
+                _remove_empty(trash)
+                return True
+            if entries == previous:
+                return True
+            units, opened = _expand(list(entries), workers * 4)
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                list(pool.map(_delete, units))
+            for path in reversed(opened):
+                shutil.rmtree(path, ignore_errors=True)
+        previous = entries
+
+
+def _remove_empty(trash: Path) -> None:
+    """Drop an emptied trash dir, unless something was trashed meanwhile."""
+    (trash / LOCK_NAME).unlink(missing_ok=True)
+    try:
+        trash.rmdir()
+    except OSError:
+        pass
+
+
+def purge_in_background(trash: Path) -> None:
+    subprocess.Popen(
+        [sys.executable, "-m", "git_wt.trash", str(trash)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={k: v for k, v in os.environ.items() if k != tracing.ENV_VAR},
+        start_new_session=True,
+    )
+
+
+if __name__ == "__main__":
+    purge(Path(sys.argv[1]))
@@ -0,0 +1,464 @@
+import subprocess
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import questionary
+from prompt_toolkit.completion import Completer, Completion
+from rich.live import Live
+from rich.markup import escape
+from rich.progress import (
+    BarColumn,
+    DownloadColumn,
+    Progress,
+    TextColumn,
+    TransferSpeedColumn,
+)
+from rich.table import Table
+
+from . import git, pool, trash
+from .branches import BranchIndex
+from .config import Config, Hook, config_exists, load_config, save_config
+from .console import get_console
+from .hooks import hook_cache, run_hooks
+from .listing import load_entries
+from .status import STATUS_STYLES, StatusCache, iter_statuses
+from .sync import sync_worktrees
+from .worktree import create_worktree, generate_worktree_path
+
+console = get_console()
+
+FILE_MODES = ["copy", "symlink", "reflink", "hardlink"]
+AGE_UNITS = (("y", 365 * 86400), ("mo", 30 * 86400), ("d", 86400), ("h", 3600))
+
+
+def format_size(num: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if num < 1024:
+            return f"{num:.0f} {unit}" if unit == "B" else f"{num:.1f} {unit}"
+        num /= 1024
+    return f"{num:.1f} TB"
+
+
+def copy_to_clipboard(text: str) -> bool:
+    try:
+        subprocess.run(
+            ["pbcopy"],
+            input=text.encode(),
+            check=True,
+            stderr=subprocess.DEVNULL,
+        )
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
+        pass
+
+    try:
+        subprocess.run(
+            ["xclip", "-selection", "clipboard"],
+            input=text.encode(),
+            check=True,
+            stderr=subprocess.DEVNULL,
+        )
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
+        pass
+
+    try:
+        subprocess.run(
+            ["xsel", "--clipboard", "--input"],
+            input=text.encode(),
+            check=True,
+            stderr=subprocess.DEVNULL,
+        )
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
+        pass
+
+    return False
+
+
+def open_in_finder(path: Path) -> bool:
+    try:
+        subprocess.run(["open", str(path)], check=True)
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        try:
+            subprocess.run(["xdg-open", str(path)], check=True)
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return False
+
+
+def format_age(timestamp: int) -> str:
+    seconds = max(0, time.time() - timestamp)
+    if seconds < 60:
+        return "just now"
+    for unit, size in AGE_UNITS:
+        if seconds >= size:
+            return f"{seconds // size:.0f}{unit} ago"
+    return f"{seconds // 60:.0f}m ago"
+
+
+class BranchCompleter(Completer):
+    """Fuzzy, recency-ranked branch completion backed by a ``BranchIndex``."""
+
+    def __init__(self, index: BranchIndex, limit: int = 50):
+        self.index = index
+        self.limit = limit
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor
+        for branch in self.index.search(text, self.limit):
+            meta = f"{format_age(branch.committed)}, {branch.author}"
+            if branch.remote:
+                meta += " (remote)"
+            yield Completion(branch.name, start_position=-len(text), display_meta=meta)
+
+
+def setup_config(repo_root: Path) -> Config | None:
+    console.print("\n[yellow]No config found. Let's create one.[/yellow]\n")
+
+    files_input = questionary.text(
+        "Files to sync (comma-separated, globs allowed):",
+        default=".env, .envrc",
+    ).ask()
+
+    if files_input is None:
+        return None
+
+    file_paths = [f.strip() for f in files_input.split(",") if f.strip()]
+
+    mode = questionary.select(
+        "Mode:",
+        choices=FILE_MODES,
+        default="copy",
+    ).ask()
+
+    if mode is None:
+        return None
+
+    hook_input = questionary.text(
+        "Post-create hook (optional):",
+        default="",
+    ).ask()
+
+    if hook_input is None:
+        return None
+
+    hooks = [Hook(run=hook_input.strip())] if hook_input.strip() else []
+
+    save = questionary.confirm("Save config?", default=True).ask()
+
+    if save is None:
+        return None
+
+    config = Config(
+        file_mode=mode,
+        file_paths=file_paths,
+        post_create_hooks=hooks,
+    )
+
+    if save:
+        save_config(repo_root, config)
+        console.print("[green]✓ Config saved to .git-wt.toml[/green]\n")
+
+    return config
+
+
+def edit_config(repo_root: Path, config: Config) -> Config | None:
+    console.print()
+
+    files_input = questionary.text(
+        "Files to sync (comma-separated, globs allowed):",
+        default=", ".join(config.file_paths),
+    ).ask()
+
+    if files_input is None:
+        return None
+
+    file_paths = [f.strip() for f in files_input.split(",") if f.strip()]
+
+    mode = questionary.select(
+        "Mode:",
+        choices=FILE_MODES,
+        default=config.file_mode,
+    ).ask()
+
+    if mode is None:
+        return None
+
+    hook_input = questionary.text(
+        "Post-create hook (optional):",
+        default=config.post_create_hooks[0].run if config.post_create_hooks else "",
+    ).ask()
+
+    if hook_input is None:
+        return None
+
+    hooks = [Hook(run=hook_input.strip())] if hook_input.strip() else []
+    existing = config.post_create_hooks
+    if existing and hook_input.strip() == existing[0].run:
+        hooks = existing
+
+    new_config = replace(
+        config,
+        file_mode=mode,
+        file_paths=file_paths,
+        post_create_hooks=hooks,
+    )
+
+    save_config(repo_root, new_config)
+    console.print("[green]✓ Config saved[/green]\n")
+
+    return new_config
+
+
+def new_worktree(repo_root: Path, config: Config) -> None:
+    index = BranchIndex.for_repo(cwd=repo_root)
+    completer = BranchCompleter(index)
+
+    branch = questionary.autocomplete(
+        "Branch:",
+        choices=index.names,
+        completer=completer,
+        validate=lambda x: len(x.strip()) > 0 or "Branch name required",
+    ).ask()
+
+    if branch is None:
+        return
+
+    branch = branch.strip()
+    
+    # Check if this is a new branch
+    is_new_branch = not git.branch_exists(branch, cwd=repo_root)
+    base_branch = None
+    
+    if is_new_branch:
+        default_base = git.get_default_branch(cwd=repo_root)
+        base_branch = questionary.autocomplete(
+            "Create from branch:",
+            choices=index.names,
+            completer=completer,
+            default=default_base,
+            validate=lambda x: len(x.strip()) > 0 or "Base branch required",
+        ).ask()
+        
+        if base_branch is None:
+            return
+        base_branch = base_branch.strip()
+
+    default_path = generate_worktree_path(repo_root, branch)
+
+    path_input = questionary.text(
+        "Path:",
+        default=str(default_path),
+    ).ask()
+
+    if path_input is None:
+        return
+
+    worktree_path = Path(path_input).expanduser().resolve()
+
+    if worktree_path.exists():
+        console.print(f"[red]✗ Path already exists: {worktree_path}[/red]")
+        return
+
+    console.print()
+
+    try:
+        with Progress(
+            TextColumn("  [dim]Syncing files[/dim]"),
+            BarColumn(),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+            console=console,
+            transient=True,
+        ) as progress:
+            task = None
+
+            def on_progress(done: int, total: int) -> None:
+                nonlocal task
+                if task is None:
+                    task = progress.add_task("sync", total=total)
+                progress.update(task, completed=done)
+
+            result = create_worktree(
+                repo_root,
+                branch,
+                worktree_path,
+                config,
+                base_branch=base_branch,
+                on_progress=on_progress,
+            )
+        sync = result.sync
+        if result.from_pool:
+            console.print("[green]✓ Worktree created (from pool)[/green]")
+        else:
+            console.print("[green]✓ Worktree created[/green]")
+
+        if sync.synced:
+            copied = config.file_mode in ("copy", "reflink")
+            mode_verb = "Copied" if copied else "Linked"
+            console.print(f"[green]✓ {mode_verb}: {', '.join(sync.synced)}[/green]")
+
+        if sync.stats and sync.stats.files:
+            console.print(
+                f"  [dim]{sync.stats.files} files, "
+                f"{format_size(sync.stats.bytes_deduped)} of "
+                f"{format_size(sync.stats.bytes_total)} deduplicated[/dim]"
+            )
+
+        if sync.skipped:
+            console.print(
+                f"[yellow]⚠ Not found: {', '.join(sync.skipped)}[/yellow]"
+            )
+
+        if config.post_create_hooks:
+            run_hooks(
+                worktree_path,
+                config.post_create_hooks,
+                console,
+                jobs=config.hook_jobs,
+                cache=hook_cache(repo_root, config),
+            )
+
+        if copy_to_clipboard(str(worktree_path)):
+            console.print("[green]✓ Path copied to clipboard[/green]")
+
+    except (git.GitError, OSError) as e:
+        console.print(f"[red]✗ {e}[/red]")
+
+    if config.pool_size > 0:
+        pool.refill_in_background(repo_root)
+
+
+def list_worktrees(repo_root: Path, config: Config) -> None:
+    entries = load_entries(repo_root)
+
+    if not entries:
+        console.print("[yellow]No worktrees found[/yellow]")
+        return
+
+    worktrees = [wt for wt, _ in entries]
+    statuses: list[str | None] = [s for _, s in entries]
+    # Worktrees the daemon has not probed yet (or all, without a daemon).
+    pending = [i for i, s in enumerate(statuses) if s is None]
+    try:
+        commits = git.get_commits([wt.head for wt in worktrees], cwd=repo_root)
+    except git.GitError:
+        commits = {}
+
+    def render() -> Table:
+        table = Table()
+        table.add_column("Branch", style="cyan")
+        table.add_column("Path")
+        table.add_column("Commit", overflow="ellipsis", no_wrap=True)
+        table.add_column("Status")
+        for wt, status in zip(worktrees, statuses):
+            branch = wt.branch or "(detached)"
+            commit = commits.get(wt.head)
+            summary = ""
+            if commit:
+                summary = f"[dim]{commit.short}[/dim] {escape(commit.subject)}"
+            cell = STATUS_STYLES[status] if status else "[dim]…[/dim]"
+            table.add_row(branch, str(wt.path), summary, cell)
+        return table
+
+    console.print()
+    with Live(render(), console=console, auto_refresh=False) as live:
+        for i, status in iter_statuses(
+            [worktrees[i] for i in pending],
+            quick=config.status_mode == "quick",
+            workers=config.status_workers,
+            timeout=config.status_timeout,
+            cache=StatusCache.for_repo(config.status_cache_ttl, cwd=repo_root),
+        ):
+            statuses[pending[i]] = status
+            live.update(render(), refresh=True)
+    console.print()
+
+
+def remove_worktree(repo_root: Path, config: Config) -> None:
+    worktrees = git.get_worktrees(cwd=repo_root)
+
+    main_worktree = repo_root
+    removable = [
+        wt
+        for wt in worktrees
+        if wt.path != main_worktree and not pool.is_spare(wt.path, repo_root)
+    ]
+
+    if not removable:
+        console.print("[yellow]No worktrees to remove[/yellow]")
+        return
+
+    choices = [
+        questionary.Choice(
+            f"{wt.branch or '(detached)'} ({wt.path})",
+            value=wt,
+        )
+        for wt in removable
+    ]
+
+    selected = questionary.select("Select worktree to remove:", choices=choices).ask()
+
+    if selected is None:
+        return
+
+    is_dirty = git.is_dirty(selected.path)
+
+    if is_dirty:
+        console.print("\n[yellow]⚠ Worktree has uncommitted changes![/yellow]")
+        confirm = questionary.confirm("Remove anyway?", default=False).ask()
+        if not confirm:
+            console.print("[dim]Cancelled[/dim]")
+            return
+
+    try:
+        if config.fast_remove:
+            trash.remove(selected.path, force=is_dirty, cwd=repo_root)
+        else:
+            git.remove_worktree(selected.path, force=is_dirty, cwd=repo_root)
+        console.print(f"[green]✓ Removed: {selected.path}[/green]")
+    except git.GitError as e:
+        console.print(f"[red]✗ {e}[/red]")
+
+
+def main_menu(repo_root: Path, config: Config) -> str | None:
+    return questionary.select(
+        "What do you want to do?",
+        choices=[
+            questionary.Choice("New worktree", value="new"),
+            questionary.Choice("List worktrees", value="list"),
+            questionary.Choice("Remove worktree", value="remove"),
+            questionary.Choice("Sync files", value="sync"),
+            questionary.Choice("Edit config", value="config"),
+            questionary.Choice("Quit", value="quit"),
+        ],
+    ).ask()
+
+
+def run_interactive(main_worktree: Path) -> int:
+    if config_exists(main_worktree):
+        config = load_config(main_worktree)
+    else:
+        config = setup_config(main_worktree)
+        if config is None:
+            return 0
+
+    action = main_menu(main_worktree, config)
+
+    if action is None or action == "quit":
+        return 0
+    elif action == "new":
+        new_worktree(main_worktree, config)
+    elif action == "list":
+        list_worktrees(main_worktree, config)
+    elif action == "remove":
+        remove_worktree(main_worktree, config)
+    elif action == "sync":
+        sync_worktrees(main_worktree, config)
+    elif action == "config":
+        edit_config(main_worktree, config)
+
+    return 0
@@ -0,0 +1,131 @@
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+import os
+import tomllib
+from typing import TypeVar
+
+from . import git
+from .config import Config, load_config
+from .listing import load_entries
+from .status import StatusCache, worktree_status_async
+
+ENV_VAR = "GIT_WT_WORKSPACE"
+MAX_DEPTH = 3
+JOBS = 8
+
+T = TypeVar("T")
+
+
+@dataclass
+class Repo:
+    root: Path
+    name: str
+    config: Config = field(default_factory=Config)
+    worktrees: list[git.Worktree] = field(default_factory=list)
+    # Statuses already known from the repo's daemon, None where unknown.
+    statuses: list[str | None] = field(default_factory=list)
+    error: str | None = None
+
+
+def root_from_env() -> Path | None:
+    value = os.environ.get(ENV_VAR)
+    return Path(value).expanduser() if value else None
+
+
+def discover(root: Path, max_depth: int = MAX_DEPTH) -> list[Path]:
+    """Main worktrees of the repositories under ``root``, sorted by path.
+
+    Repositories are not searched for nested ones, and hidden directories
+    (pools, trash) and linked worktrees, whose ``.git`` is a file, are skipped.
+    """
+    repos = []
+    level = [root.resolve()]
+    for depth in range(max_depth + 1):
+        below = []
+        for directory in level:
+            dotgit = directory / ".git"
+            if dotgit.is_dir():
+                repos.append(directory)
+                continue
+            if dotgit.exists() or depth == max_depth:
+                continue
+            try:
+                below.extend(
+                    Path(e.path)
+                    for e in os.scandir(directory)
+                    if not e.name.startswith(".") and e.is_dir(follow_symlinks=False)
+                )
+            except OSError:
+                continue
+        level = below
+    return sorted(repos)
+
+
+def repo_name(root: Path, workspace: Path) -> str:
+    """The repository's path relative to the workspace root, for display."""
+    name = os.path.relpath(root, workspace.resolve())
+    return root.name if name == "." else name
+
+
+def _scan_one(root: Path, workspace: Path) -> Repo:
+    repo = Repo(root, repo_name(root, workspace))
+    try:
+        repo.config = load_config(root)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        repo.error = f"invalid config: {e}"
+        return repo
+
+    try:
+        entries = load_entries(root)
+    except git.GitError as e:
+        repo.error = str(e)
+        return repo
+    repo.worktrees = [wt for wt, _ in entries]
+    repo.statuses = [s for _, s in entries]
+    return repo
+
+
+def map_repos(fn: Callable[[Path], T], roots: list[Path], jobs: int = JOBS) -> list[T]:
+    """Call ``fn`` for each repository, up to ``jobs`` at a time, keeping order."""
+    if len(roots) <= 1:
+        return [fn(root) for root in roots]
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(roots)))) as ex:
+        return list(ex.map(fn, roots))
+
+
+def scan(workspace: Path, roots: list[Path], jobs: int = JOBS) -> list[Repo]:
+    """Load each repository's config and worktree list in parallel."""
+    return map_repos(partial(_scan_one, workspace=workspace), roots, jobs)
+
+
+def iter_statuses(repos: list[Repo]) -> Iterator[tuple[int, int, str]]:
+    """Probe every worktree the daemons did not answer for, across all repos
+    at once, yielding ``(repo index, worktree index, status)`` as each finishes.
+
+    Each probe uses its own repo's status settings and cache.
+    """
+    targets = []
+    calls = []
+    for r, repo in enumerate(repos):
+        config = repo.config
+        dirs = git.discover_git_dirs(repo.root)
+        common_dir = dirs[1] if dirs is not None else git.get_common_dir(cwd=repo.root)
+        cache = StatusCache.for_common_dir(common_dir, config.status_cache_ttl)
+        for w, wt in enumerate(repo.worktrees):
+            if repo.statuses[w] is None:
+                targets.append((r, w))
+                calls.append(
+                    partial(
+                        worktree_status_async,
+                        wt,
+                        config.status_mode == "quick",
+                        config.status_timeout,
+                        cache,
+                    )
+                )
+    workers = max((repo.config.status_workers for repo in repos), default=8)
+    for i, status in git.iter_completed(calls, workers):
+        yield *targets[i], status
@@ -1,9 +1,30 @@
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
+import os
 import re
 import shutil
 
-from . import git
+from . import git, pool, tracing
 from .config import Config
+from .copier import CopyPlan, ProgressCallback, clone_file, copy_plan
+from .patterns import resolve_paths
+from .store import LinkStats, ObjectStore
+from .sync import record_baseline, sync_all
+
+
+@dataclass
+class SyncResult:
+    synced: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    stats: LinkStats | None = None
+
+
+@dataclass
+class CreateResult:
+    sync: SyncResult
+    is_new_branch: bool
+    from_pool: bool = False
 
 
 def sanitize_branch_name(branch: str) -> str:
@@ -19,10 +40,16 @@ def generate_worktree_path(repo_root: Path, branch: str) -> Path:
 
 
 def copy_files(
-    source_root: Path, target_root: Path, paths: list[str]
+    source_root: Path,
+    target_root: Path,
+    paths: list[str],
+    copy_function: Callable = shutil.copy2,
+    workers: int = 8,
+    on_progress: ProgressCallback | None = None,
 ) -> tuple[list[str], list[str]]:
     copied = []
     skipped = []
+    plan = CopyPlan()
     for path_str in paths:
         source = source_root / path_str
         target = target_root / path_str
@@ -36,12 +63,14 @@ def copy_files(
         if source.is_dir():
             if target.exists():
                 shutil.rmtree(target)
-            shutil.copytree(source, target)
+            plan.add_tree(source, target)
         else:
-            shutil.copy2(source, target)
+            plan.add_file(source, target)
 
         copied.append(path_str)
 
+    copy_plan(plan, copy_function, workers=workers, on_progress=on_progress)
+
     return copied, skipped
 
 
@@ -74,31 +103,150 @@ def symlink_files(
     return linked, skipped
 
 
+def hardlink_files(
+    source_root: Path,
+    target_root: Path,
+    paths: list[str],
+    store: ObjectStore,
+) -> tuple[list[str], list[str], LinkStats]:
+    linked = []
+    skipped = []
+    stats = LinkStats()
+    for path_str in paths:
+        source = source_root / path_str
+        target = target_root / path_str
+
+        if not source.exists():
+            skipped.append(path_str)
+            continue
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        if source.is_dir():
+            if target.exists():
+                shutil.rmtree(target)
+            for dirpath, dirnames, filenames in os.walk(source):
+                src_dir = Path(dirpath)
+                dst_dir = target / src_dir.relative_to(source)
+                dst_dir.mkdir(exist_ok=True)
+                for name in dirnames + filenames:
+                    src = src_dir / name
+                    if src.is_symlink():
+                        (dst_dir / name).symlink_to(os.readlink(src))
+                    elif name in filenames:
+                        store.link(src, dst_dir / name, stats)
+        else:
+            store.link(source, target, stats)
+
+        linked.append(path_str)
+
+    return linked, skipped, stats
+
+
+def sync_files(
+    source_root: Path,
+    target_root: Path,
+    paths: list[str],
+    mode: str,
+    workers: int = 8,
+    on_progress: ProgressCallback | None = None,
+) -> SyncResult:
+    with tracing.span("sync files", "files", mode=mode, target=target_root) as info:
+        if mode == "symlink":
+            result = SyncResult(*symlink_files(source_root, target_root, paths))
+        elif mode == "hardlink":
+            store = ObjectStore.for_repo(cwd=source_root)
+            result = SyncResult(
+                *hardlink_files(source_root, target_root, paths, store)
+            )
+        else:
+            copy_function = clone_file if mode == "reflink" else shutil.copy2
+            result = SyncResult(
+                *copy_files(
+                    source_root,
+                    target_root,
+                    paths,
+                    copy_function=copy_function,
+                    workers=workers,
+                    on_progress=on_progress,
+                )
+            )
+        info["synced"] = len(result.synced)
+        info["skipped"] = len(result.skipped)
+        return result
+
+
 def create_worktree(
     repo_root: Path,
     branch: str,
     worktree_path: Path,
     config: Config,
     base_branch: str | None = None,
-) -> tuple[list[str], list[str], bool]:
-    is_new_branch = not git.branch_exists(branch, cwd=repo_root)
-
-    if is_new_branch:
-        if base_branch is None:
-            base_branch = git.get_default_branch(cwd=repo_root)
-        git.add_worktree(
-            worktree_path, branch, new_branch=True, base=base_branch, cwd=repo_root
-        )
-    else:
-        git.add_worktree(worktree_path, branch, cwd=repo_root)
+    on_progress: ProgressCallback | None = None,
+    sparse: list[str] | None = None,
+    no_checkout: bool | None = None,
+) -> CreateResult:
+    """Create a worktree for ``branch`` and sync configured files into it.
+
+    ``sparse`` and ``no_checkout`` override the ``[worktree]`` config. Sparse
+    patterns are applied before the first checkout, so files outside them
+    are never written.
+    """
+    if sparse is None:
+        sparse = config.sparse_paths
+    if no_checkout is None:
+        no_checkout = config.no_checkout
 
-    if config.file_mode == "symlink":
-        synced_files, skipped_files = symlink_files(
-            repo_root, worktree_path, config.file_paths
-        )
-    else:
-        synced_files, skipped_files = copy_files(
-            repo_root, worktree_path, config.file_paths
+    is_new_branch = not git.branch_exists(branch, cwd=repo_root)
+    if is_new_branch and base_branch is None:
+        base_branch = git.get_default_branch(cwd=repo_root)
+
+    full_checkout = not sparse and not no_checkout
+    if full_checkout and config.pool_size > 0 and pool.claim(
+        repo_root, branch, worktree_path, is_new_branch, base_branch
+    ):
+        # The spare was synced when it was warmed; only push what changed
+        # since. Nothing in it has been edited, so differences are overwritten.
+        if config.file_mode != "symlink":
+            for report in sync_all(repo_root, [worktree_path], config, force=True):
+                if report.error:
+                    raise git.GitError(
+                        f"Worktree created at {worktree_path}, "
+                        f"but syncing files failed: {report.error}"
+                    )
+        paths, unmatched = resolve_paths(repo_root, config)
+        sync = SyncResult(
+            synced=[p for p in paths if (repo_root / p).exists()],
+            skipped=[p for p in paths if not (repo_root / p).exists()] + unmatched,
         )
-
-    return synced_files, skipped_files, is_new_branch
+        return CreateResult(sync, is_new_branch, from_pool=True)
+
+    # Only registering the worktree touches the shared repo; the checkout
+    # itself runs afterwards so concurrent creations can overlap.
+    git.add_worktree(
+        worktree_path,
+        branch,
+        new_branch=is_new_branch,
+        base=base_branch,
+        cwd=repo_root,
+        no_checkout=True,
+    )
+    if sparse:
+        git.set_sparse_checkout(worktree_path, sparse)
+    if not no_checkout:
+        git.populate_worktree(worktree_path)
+
+    paths, unmatched = resolve_paths(repo_root, config)
+    sync = sync_files(
+        repo_root,
+        worktree_path,
+        paths,
+        config.file_mode,
+        workers=config.file_workers,
+        on_progress=on_progress,
+    )
+    sync.skipped.extend(unmatched)
+    if config.file_mode != "symlink":
+        record_baseline(repo_root, worktree_path, sync.synced)
+
+    return CreateResult(sync, is_new_branch)
@@ -0,0 +1,76 @@
+import subprocess
+from pathlib import Path
+
+from git_wt.branches import BranchIndex, refs_token
+from git_wt.git import Branch
+
+
+def make_index(names: list[str]) -> BranchIndex:
+    # Earlier names are more recent.
+    return BranchIndex([Branch(name, 1000 - i, "dev") for i, name in enumerate(names)])
+
+
+def names(branches: list[Branch]) -> list[str]:
+    return [b.name for b in branches]
+
+
+def test_search_ranks_tiers_before_recency() -> None:
+    index = make_index(
+        [
+            "f-i-x-up",  # fuzzy
+            "hotfix",  # substring
+            "feature/fix-login",  # boundary
+            "fix-login",  # prefix
+            "fix",  # exact, least recent of all
+        ]
+    )
+    assert names(index.search("fix")) == [
+        "fix",
+        "fix-login",
+        "feature/fix-login",
+        "hotfix",
+        "f-i-x-up",
+    ]
+
+
+def test_search_orders_by_recency_within_a_tier() -> None:
+    index = make_index(["feat-b", "main", "feat-a", "feat-c"])
+    assert names(index.search("feat")) == ["feat-b", "feat-a", "feat-c"]
+
+
+def test_search_fuzzy_prefers_small_gaps() -> None:
+    index = make_index(["a-lengthy-b-c", "abxc", "unrelated"])
+    assert names(index.search("abc")) == ["abxc", "a-lengthy-b-c"]
+
+
+def test_search_is_case_insensitive_and_limited() -> None:
+    index = make_index([f"Feature-{i}" for i in range(100)])
+    found = index.search("FEATURE", limit=5)
+    assert names(found) == [f"Feature-{i}" for i in range(5)]
+
+
+def test_search_empty_query_returns_most_recent() -> None:
+    index = make_index(["new", "old"])
+    assert names(index.search("  ")) == ["new", "old"]
+    assert names(index.search("\n")) == ["new", "old"]
+
+
+def test_search_without_match() -> None:
+    assert make_index(["main"]).search("zzz") == []
+
+
+def test_search_handles_regex_characters() -> None:
+    index = make_index(["release/1.2", "release-102"])
+    assert names(index.search("1.2")) == ["release/1.2"]
+    assert names(index.search("e(")) == []
+
+
+def test_for_repo_rebuilds_when_refs_change(git_repo: Path) -> None:
+    common_dir = git_repo / ".git"
+    assert names(BranchIndex.for_repo(cwd=git_repo).search("topic")) == []
+    token = refs_token(common_dir)
+    assert (common_dir / "git-wt" / "branches.json").exists()
+
+    subprocess.run(["git", "branch", "topic"], cwd=git_repo, check=True)
+    assert refs_token(common_dir) != token
+    assert names(BranchIndex.for_repo(cwd=git_repo).search("topic")) == ["topic"]
@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import git_wt
+from git_wt import gc, git
+from git_wt.config import Config
+
+SRC = Path(git_wt.__file__).resolve().parents[1]
+
+
+def sh(repo: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", *args], cwd=repo, check=True, capture_output=True, text=True
+    )
+    return result.stdout.strip()
+
+
+def git_wt_cli(repo: Path, *args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    return subprocess.run(
+        [sys.executable, "-m", "git_wt.cli", *args],
+        cwd=repo,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def branches(repo: Path) -> set[str]:
+    return set(sh(repo, "branch", "--format=%(refname:short)").split())
+
+
+@pytest.fixture
+def merged_worktree(git_repo: Path) -> Path:
+    """A linked worktree whose branch has a commit merged into main."""
+    path = git_repo.parent / "repo-feature"
+    sh(git_repo, "worktree", "add", "-q", "-b", "feature", str(path))
+    sh(path, "commit", "-q", "--allow-empty", "-m", "feature")
+    sh(git_repo, "merge", "-q", "--ff-only", "feature")
+    return path
+
+
+def test_merged_branch_is_removed_and_deleted(
+    git_repo: Path, merged_worktree: Path
+) -> None:
+    untouched = git_repo.parent / "repo-new"
+    sh(git_repo, "worktree", "add", "-q", "-b", "new", str(untouched))
+
+    result = git_wt_cli(git_repo, "gc", "-y", "--delete-branches")
+
+    assert result.returncode == 0, result.stderr
+    assert not merged_worktree.exists()
+    assert untouched.exists()
+    assert branches(git_repo) == {"main", "new"}
+
+
+def test_base_branch_checked_out_elsewhere_is_kept(git_repo: Path) -> None:
+    # The main worktree moves to dev, and main is checked out in a linked
+    # worktree; git branch --merged main lists main itself.
+    sh(git_repo, "checkout", "-q", "-b", "dev")
+    sh(git_repo, "commit", "-q", "--allow-empty", "-m", "dev")
+    main_path = git_repo.parent / "repo-main"
+    sh(git_repo, "worktree", "add", "-q", str(main_path), "main")
+    sh(main_path, "commit", "-q", "--allow-empty", "-m", "main moved")
+
+    assert gc.find_candidates(git_repo, Config()) == []
+    result = git_wt_cli(git_repo, "gc", "-y", "--delete-branches")
+
+    assert result.returncode == 0, result.stderr
+    assert main_path.exists()
+    assert branches(git_repo) == {"dev", "main"}
+
+
+def test_slow_remove_leaves_worktrees_git_refuses(
+    git_repo: Path, merged_worktree: Path
+) -> None:
+    candidates = gc.find_candidates(git_repo, Config())
+    assert [c.worktree.path for c in candidates] == [merged_worktree]
+
+    # Changed after the check, e.g. while the confirmation prompt was open.
+    (merged_worktree / "notes.txt").write_text("keep me")
+    (result,) = gc.remove_candidates(git_repo, candidates, fast=False)
+
+    assert not result.ok
+    assert (merged_worktree / "notes.txt").exists()
+    assert merged_worktree in [wt.path for wt in git.get_worktrees(cwd=git_repo)]
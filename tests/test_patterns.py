@@ -0,0 +1,125 @@
+import re
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from git_wt.config import DEFAULT_EXCLUDE
+from git_wt.patterns import _translate, compile_patterns, expand_paths, is_glob
+
+
+@pytest.mark.parametrize(
+    "pattern, path, matches",
+    [
+        (".env*", ".env", True),
+        (".env*", ".env.local", True),
+        (".env*", "packages/api/.env.test", True),
+        (".env*", "env", False),
+        ("*.json", "a/b/c.json", True),
+        ("*.json", "c.json5", False),
+        ("packages/*/.env", "packages/api/.env", True),
+        ("packages/*/.env", "packages/api/sub/.env", False),
+        ("packages/*/.env", "other/packages/api/.env", False),
+        ("/config", "config", True),
+        ("/config", "src/config", False),
+        ("**/*.local.json", "dev.local.json", True),
+        ("**/*.local.json", "config/a/dev.local.json", True),
+        ("a/**/b", "a/b", True),
+        ("a/**/b", "a/x/y/b", True),
+        ("file?.txt", "file1.txt", True),
+        ("file?.txt", "file10.txt", False),
+        ("[!a]*.txt", "b.txt", True),
+        ("[!a]*.txt", "a.txt", False),
+        ("cache/", "cache/x/y", True),
+        ("cache", "cachex", False),
+    ],
+)
+def test_translate(pattern: str, path: str, matches: bool) -> None:
+    assert bool(re.fullmatch(_translate(pattern), path)) is matches
+
+
+def test_compile_patterns_reports_first_matching_pattern() -> None:
+    regex = compile_patterns(["*.json", ".env*"])
+    assert regex.fullmatch("a/.env").lastindex == 2
+    assert regex.fullmatch("x.json").lastindex == 1
+    assert regex.fullmatch("x.txt") is None
+    assert compile_patterns([]) is None
+
+
+def test_is_glob() -> None:
+    assert is_glob("*.env") and is_glob("file?") and is_glob("[ab]")
+    assert not is_glob(".env") and not is_glob("config/app.yaml")
+
+
+@pytest.fixture
+def project(git_repo: Path) -> Path:
+    (git_repo / ".gitignore").write_text(".env*\n*.local.json\nnode_modules/\ncache/\n")
+    files = [
+        ".env",
+        ".env.local",
+        "packages/api/.env",
+        "packages/web/.env",
+        "packages/web/node_modules/pkg/.env",
+        "config/dev.local.json",
+        "cache/blob",
+        "tracked.txt",
+    ]
+    for name in files:
+        (git_repo / name).parent.mkdir(parents=True, exist_ok=True)
+        (git_repo / name).write_text(name)
+    subprocess.run(
+        ["git", "add", ".gitignore", "tracked.txt"], cwd=git_repo, check=True
+    )
+    return git_repo
+
+
+def test_expand_paths_literals_only_runs_no_git(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from git_wt import git
+
+    def fail(*args, **kwargs):
+        raise AssertionError("git was run")
+
+    monkeypatch.setattr(git, "iter_ignored_files", fail)
+    assert expand_paths(tmp_path, [".env", "missing"]) == ([".env", "missing"], [])
+
+
+def test_expand_paths_globs(project: Path) -> None:
+    paths, unmatched = expand_paths(
+        project,
+        [".env*", "packages/*/.env", "**/*.local.json", "nope/*", "literal"],
+        exclude=DEFAULT_EXCLUDE,
+    )
+    assert sorted(paths) == [
+        ".env",
+        ".env.local",
+        "config/dev.local.json",
+        "literal",
+        "packages/api/.env",
+        "packages/web/.env",
+    ]
+    # Only the glob matching nothing is reported; packages/*/.env matched
+    # files that .env* claimed first.
+    assert unmatched == ["nope/*"]
+
+
+def test_expand_paths_include_ignored(project: Path) -> None:
+    paths, unmatched = expand_paths(
+        project, [], include_ignored=True, exclude=DEFAULT_EXCLUDE
+    )
+    # git reports packages/ whole; it is split only around node_modules.
+    assert sorted(paths) == [
+        ".env",
+        ".env.local",
+        "cache",
+        "config",
+        "packages/api",
+        "packages/web/.env",
+    ]
+    assert unmatched == []
+
+
+def test_expand_paths_exclude_overrides_match(project: Path) -> None:
+    paths, _ = expand_paths(project, [".env*"], exclude=["packages"])
+    assert sorted(paths) == [".env", ".env.local"]
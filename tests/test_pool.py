@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pytest
+
+from git_wt import pool
+from git_wt.config import Config
+from git_wt.worktree import create_worktree
+
+
+@pytest.fixture
+def config(git_repo: Path) -> Config:
+    (git_repo / ".env").write_text("PORT=1\n")
+    (git_repo / ".env.test").write_text("PORT=2\n")
+    config = Config(file_paths=[".env", ".env.test"], pool_size=1)
+    assert pool.fill(git_repo, config) == 1
+    return config
+
+
+def test_claim_leaves_unchanged_files_untouched(git_repo: Path, config: Config) -> None:
+    (spare,) = pool.ready_spares(git_repo)
+    inodes = {name: (spare / name).stat().st_ino for name in config.file_paths}
+
+    target = git_repo.parent / "repo-feature"
+    result = create_worktree(git_repo, "feature", target, config)
+
+    assert result.from_pool
+    assert {n: (target / n).stat().st_ino for n in config.file_paths} == inodes
+
+
+def test_claim_pushes_files_changed_since_warming(
+    git_repo: Path, config: Config
+) -> None:
+    (spare,) = pool.ready_spares(git_repo)
+    kept = (spare / ".env.test").stat().st_ino
+    (git_repo / ".env").write_text("PORT=3\n")
+
+    target = git_repo.parent / "repo-feature"
+    result = create_worktree(git_repo, "feature", target, config)
+
+    assert result.from_pool
+    assert (target / ".env").read_text() == "PORT=3\n"
+    assert (target / ".env.test").stat().st_ino == kept
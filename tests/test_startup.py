@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import git_wt
+
+SRC = Path(git_wt.__file__).resolve().parents[1]
+UI_PACKAGES = {"rich", "questionary", "prompt_toolkit"}
+# Budgets are about three times the timings on a laptop (~50ms to import the
+# CLI and build its parser, ~80ms for a whole status --prompt run), and the
+# best of a few runs is used, so CI noise passes but a heavy import does not.
+IMPORT_BUDGET = 0.15
+PROMPT_BUDGET = 0.25
+RUNS = 3
+IMPORT_CLI = """
+import time
+start = time.perf_counter()
+import git_wt.cli
+git_wt.cli.build_parser()
+print(time.perf_counter() - start)
+"""
+
+
+def run_python(
+    args: list[str], cwd: Path, importtime: bool = False
+) -> tuple[subprocess.CompletedProcess, float]:
+    env = {k: v for k, v in os.environ.items() if not k.startswith("GIT_WT_")}
+    env["PYTHONPATH"] = str(SRC)
+    flags = ["-X", "importtime"] if importtime else []
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *flags, *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return result, time.perf_counter() - start
+
+
+def imported_packages(args: list[str], cwd: Path) -> set[str]:
+    result, _ = run_python(args, cwd, importtime=True)
+    assert result.returncode == 0, result.stderr
+    return {
+        line.rsplit("|", 1)[-1].strip().split(".")[0]
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+def test_build_parser_skips_ui_modules(tmp_path: Path) -> None:
+    packages = imported_packages(["-c", IMPORT_CLI], tmp_path)
+    assert not packages & UI_PACKAGES
+
+
+def test_build_parser_import_budget(tmp_path: Path) -> None:
+    timings = []
+    for _ in range(RUNS):
+        result, _ = run_python(["-c", IMPORT_CLI], tmp_path)
+        assert result.returncode == 0, result.stderr
+        timings.append(float(result.stdout))
+    assert min(timings) < IMPORT_BUDGET
+
+
+@pytest.mark.parametrize("dirty", [False, True])
+def test_status_prompt_skips_ui_modules(git_repo: Path, dirty: bool) -> None:
+    if dirty:
+        (git_repo / "new.txt").write_text("x")
+    args = ["-m", "git_wt.cli", "status", "--prompt"]
+    result, _ = run_python(args, git_repo)
+    assert result.stdout.strip() == ("dirty" if dirty else "clean")
+    assert not imported_packages(args, git_repo) & UI_PACKAGES
+
+
+def test_status_prompt_budget(git_repo: Path) -> None:
+    timings = []
+    for _ in range(RUNS):
+        result, elapsed = run_python(
+            ["-m", "git_wt.cli", "status", "--prompt"], git_repo
+        )
+        assert result.returncode == 0, result.stderr
+        timings.append(elapsed)
+    assert min(timings) < PROMPT_BUDGET
@@ -0,0 +1,56 @@
+import subprocess
+from pathlib import Path
+
+from git_wt.git import _parse_worktree, get_worktrees
+
+
+def test_parse_worktree_keeps_newlines_in_path_and_reasons() -> None:
+    wt = _parse_worktree(
+        [
+            b"worktree /tmp/odd\nname",
+            b"HEAD " + b"a" * 40,
+            b"branch refs/heads/feature/x",
+            b"locked on a\nremovable disk",
+            b"prunable gitdir file points to non-existent location",
+        ]
+    )
+    assert wt.path == Path("/tmp/odd\nname")
+    assert wt.head == "a" * 40
+    assert wt.branch == "feature/x"
+    assert wt.is_locked and wt.lock_reason == "on a\nremovable disk"
+    assert wt.is_prunable
+    assert wt.prunable_reason == "gitdir file points to non-existent location"
+    assert not wt.is_detached and not wt.is_bare
+
+
+def test_parse_worktree_flags_without_values() -> None:
+    wt = _parse_worktree(
+        [b"worktree /repo", b"HEAD " + b"b" * 40, b"detached", b"locked"]
+    )
+    assert wt.branch is None and wt.is_detached
+    assert wt.is_locked and wt.lock_reason is None
+    assert _parse_worktree([b"worktree /repo.git", b"bare"]).is_bare
+
+
+def test_parse_worktree_needs_a_worktree_line() -> None:
+    assert _parse_worktree([b"HEAD " + b"c" * 40]) is None
+    assert _parse_worktree([]) is None
+
+
+def test_get_worktrees_with_newline_in_path(git_repo: Path) -> None:
+    odd = git_repo.parent / "odd\nname"
+    subprocess.run(
+        ["git", "worktree", "add", "-q", "-b", "odd", str(odd)],
+        cwd=git_repo,
+        check=True,
+    )
+    subprocess.run(
+        ["git", "worktree", "lock", "--reason", "line one\nline two", str(odd)],
+        cwd=git_repo,
+        check=True,
+    )
+
+    main, linked = get_worktrees(cwd=git_repo)
+    assert main.path == git_repo and main.branch == "main"
+    assert linked.path == odd and linked.branch == "odd"
+    assert linked.lock_reason == "line one\nline two"